@@ -0,0 +1,97 @@
+import argparse
+from fnmatch import fnmatch
+import os
+import sys
+
+ap = argparse.ArgumentParser(
+    description="Compare two sets of benchmark results and detect regressions."
+)
+ap.add_argument(
+    "old",
+    help="Baseline results: A directory with result files (e.g. var/) or a run from"
+    " the history database (e.g. run:12)",
+)
+ap.add_argument("new", help="New results, in the same format as the baseline")
+ap.add_argument(
+    "benchmarks", nargs="*", default=["*"], help="Glob patterns for benchmarks to compare"
+)
+ap.add_argument(
+    "--history",
+    default="var/history.sqlite3",
+    metavar="FILE",
+    help="SQLite database for run:N arguments (default: var/history.sqlite3)",
+)
+ap.add_argument(
+    "-t",
+    "--threshold",
+    default=0.05,
+    type=float,
+    help="Fail on significant throughput regressions above this fraction (default: 0.05)",
+)
+ap.add_argument(
+    "-a",
+    "--alpha",
+    default=0.05,
+    type=float,
+    help="Significance level for the t-test (default: 0.05)",
+)
+
+
+def load(source, history_path):
+    from multipart_bench.scenarios import Result
+
+    if source.startswith("run:"):
+        from multipart_bench.history import History
+
+        history = History(history_path)
+        try:
+            return history.run_results(int(source[4:]))
+        finally:
+            history.close()
+
+    results = {}
+    for fname in sorted(os.listdir(source)):
+        if fname.endswith(".json"):
+            result = Result.load(os.path.join(source, fname))
+            results[result.name] = result
+    return results
+
+
+if __name__ == "__main__":
+    args = ap.parse_args()
+
+    from multipart_bench.analysis import compare
+
+    old = load(args.old, args.history)
+    new = load(args.new, args.history)
+    confidence_level = 1 - args.alpha
+
+    regressions = []
+    for name in sorted(old.keys() & new.keys()):
+        if not any(fnmatch(name, glob) for glob in args.benchmarks):
+            continue
+        comparison = compare(old[name], new[name], confidence_level)
+        if comparison is None:
+            print(f"{name}: not enough samples")
+            continue
+        if comparison.regression(args.threshold, args.alpha):
+            verdict = "REGRESSION"
+            regressions.append(name)
+        elif comparison.significant(args.alpha):
+            verdict = "faster" if comparison.speedup > 1 else "slower"
+        else:
+            verdict = "no significant change"
+        print(f"{name}: {comparison} {verdict}")
+
+    for label, only in (("old", old.keys() - new.keys()), ("new", new.keys() - old.keys())):
+        missing = [n for n in only if any(fnmatch(n, g) for g in args.benchmarks)]
+        if missing:
+            print(f"Skipped {len(missing)} benchmark(s) only found in {label} results")
+
+    if regressions:
+        print()
+        print(
+            f"{len(regressions)} significant regression(s) above {args.threshold:.0%}:"
+            f" {', '.join(regressions)}"
+        )
+        sys.exit(1)
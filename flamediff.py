@@ -0,0 +1,32 @@
+import argparse
+import os.path
+
+ap = argparse.ArgumentParser(
+    description="Render a differential flame graph from two collapsed stack files,"
+    " e.g. two parsers or two versions of the same parser on the same scenario."
+)
+ap.add_argument("baseline", help="Collapsed stacks of the baseline (e.g. var/<name>.folded)")
+ap.add_argument("compare", help="Collapsed stacks to compare against the baseline")
+ap.add_argument(
+    "-o",
+    "--output",
+    default=None,
+    help="Output SVG file (default: var/<baseline>-vs-<compare>.svg)",
+)
+
+if __name__ == "__main__":
+    args = ap.parse_args()
+
+    from multipart_bench.flame import flamegraph_svg, read_collapsed
+
+    def name(path):
+        return os.path.splitext(os.path.basename(path))[0]
+
+    output = args.output or f"var/{name(args.baseline)}-vs-{name(args.compare)}.svg"
+    flamegraph_svg(
+        read_collapsed(args.compare),
+        output,
+        f"{name(args.compare)} compared to {name(args.baseline)}",
+        baseline=read_collapsed(args.baseline),
+    )
+    print(output)
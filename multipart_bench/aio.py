@@ -0,0 +1,181 @@
+import asyncio
+
+from .scenarios import Scenario
+
+ASYNC_PARSERS = []
+
+
+def add_async_parser(func):
+    ASYNC_PARSERS.append(func)
+    return func
+
+
+def asgi_receive(scenario: Scenario):
+    """ASGI-style `receive()` callable that streams the scenario payload.
+
+    Each call yields to the event loop once, like a server waiting for the
+    next chunk of the request body would.
+    """
+    read = scenario.payload.read
+    chunksize = scenario.chunksize
+
+    async def receive():
+        await asyncio.sleep(0)
+        body = read(chunksize)
+        return {"type": "http.request", "body": body, "more_body": bool(body)}
+
+    return receive
+
+
+def asgi_scope(scenario: Scenario):
+    """Minimal ASGI HTTP scope for a POST request with the scenario payload."""
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"content-type", scenario.content_type.encode("latin1")),
+            (b"content-length", str(scenario.size).encode("latin1")),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+
+
+class AsyncBench:
+    """Run concurrent requests of an async adapter on a single event loop.
+
+    Instances can be used like parser functions (they take a scenario) and
+    process `concurrency` requests per call, each with its own payload reader.
+    """
+
+    def __init__(self, func, concurrency=1):
+        self.func = func
+        self.concurrency = self.requests = concurrency
+        self.in_memory = getattr(func, "in_memory", False)
+        self.__name__ = func.__name__
+        if concurrency > 1:
+            self.__name__ += f"@tasks={concurrency}"
+        self._loop = None
+
+    def __getstate__(self):
+        return {**self.__dict__, "_loop": None}
+
+    def __call__(self, scenario: Scenario):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._run(scenario))
+
+    async def _run(self, scenario):
+        views = [scenario.clone() for _ in range(self.concurrency)]
+        await asyncio.gather(*(self.func(view, asgi_receive(view)) for view in views))
+
+
+async def dummy_asgi(scenario: Scenario, receive):
+    """Overhead that all async parsers have in common."""
+    scenario.boundary
+    while (await receive())["more_body"]:
+        pass
+
+
+try:
+    import multipart
+
+    @add_async_parser
+    async def multipart_asgi(scenario: Scenario, receive):
+        with multipart.PushMultipartParser(scenario.boundary) as parser:
+            parse = parser.parse
+            while not parser.closed:
+                message = await receive()
+                for event in parse(message["body"]):
+                    pass
+
+except ImportError:
+    multipart_asgi = None
+
+
+try:
+    import werkzeug.sansio.multipart as wsans
+
+    @add_async_parser
+    async def werkzeug_asgi(scenario: Scenario, receive):
+        parser = wsans.MultipartDecoder(boundary=scenario.boundary)
+        while chunk := (await receive())["body"]:
+            parser.receive_data(chunk)
+            while True:
+                event = parser.next_event()
+                if isinstance(event, wsans.NeedData):
+                    break
+                if isinstance(event, wsans.Epilogue):
+                    return
+
+except ImportError:
+    werkzeug_asgi = None
+
+
+try:
+    import python_multipart
+
+    @add_async_parser
+    async def starlette_asgi(scenario: Scenario, receive):
+        parser = python_multipart.MultipartParser(
+            scenario.boundary,
+            callbacks={
+                "on_part_begin": lambda *a, **ka: None,
+                "on_part_data": lambda *a, **ka: None,
+                "on_part_end": lambda *a, **ka: None,
+                "on_header_field": lambda *a, **ka: None,
+                "on_header_value": lambda *a, **ka: None,
+                "on_header_end": lambda *a, **ka: None,
+                "on_headers_finished": lambda *a, **ka: None,
+                "on_end": lambda *a, **ka: None,
+            },
+        )
+        while chunk := (await receive())["body"]:
+            parser.write(chunk)
+        parser.finalize()
+
+except ImportError:
+    starlette_asgi = None
+
+
+try:
+    from streaming_form_data import StreamingFormDataParser
+    from streaming_form_data.targets import NullTarget
+
+    @add_async_parser
+    async def streaming_asgi(scenario: Scenario, receive):
+        headers = {"Content-Type": scenario.content_type}
+        parser = StreamingFormDataParser(headers=headers)
+        for name in scenario.fieldnames:
+            parser.register(name, NullTarget())
+        while chunk := (await receive())["body"]:
+            parser.data_received(chunk)
+
+except ImportError:
+    streaming_asgi = None
+
+
+import email.parser
+
+
+@add_async_parser
+async def email_asgi(scenario: Scenario, receive):
+    parser = email.parser.BytesFeedParser()
+    parser.feed(
+        b"MIME-Version: 1.0\r\nContent-Type: "
+        + scenario.content_type.encode("ASCII")
+        + b"\r\n"
+    )
+    while data := (await receive())["body"]:
+        parser.feed(data)
+    return parser.close().get_payload()
+
+
+email_asgi.in_memory = True
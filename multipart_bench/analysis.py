@@ -0,0 +1,106 @@
+from collections import namedtuple
+import math
+
+import numpy as np
+from scipy import stats
+
+#: Exponents above this (and clearly above 1) are reported as super-linear
+SUPERLINEAR_EXPONENT = 1.2
+
+
+class Complexity(namedtuple("Complexity", "exponent low high points")):
+    """Fitted runtime exponent `k` in `runtime = c * size**k`.
+
+    `low` and `high` are the bounds of the confidence interval for `k`.
+    """
+
+    @property
+    def superlinear(self):
+        """True if runtime grows clearly faster than input size.
+
+        Such parsers are potential DoS vectors: An attacker can slow them down
+        disproportionately by sending larger requests.
+        """
+        return self.low > 1 and self.exponent >= SUPERLINEAR_EXPONENT
+
+    def __str__(self):
+        return f"O(n^{self.exponent:.2f}) [{self.low:.2f}, {self.high:.2f}]"
+
+
+def fit_complexity(results, confidence_level=0.95):
+    """Fit runtime against input size for results of the same test.
+
+    Takes results of size variants of the same scenario and parser and does a
+    linear regression on the log-log scale. Returns a `Complexity` or None if
+    there are not enough usable results.
+    """
+    points = sorted(
+        (result.size, result.avg)
+        for result in results
+        if result.times and result.avg > 0
+    )
+    if len(set(size for size, _ in points)) < 3:
+        return None
+    x = [math.log(size) for size, _ in points]
+    y = [math.log(runtime) for _, runtime in points]
+    fit = stats.linregress(x, y)
+    t = stats.t.ppf((1 + confidence_level) / 2, df=len(points) - 2)
+    return Complexity(
+        fit.slope, fit.slope - t * fit.stderr, fit.slope + t * fit.stderr, len(points)
+    )
+
+
+def distribution(values, fmt="{:.2f}"):
+    """Summarize a list of values as median, 10th-90th percentile and range."""
+    p10, median, p90 = np.percentile(values, [10, 50, 90])
+    return (
+        f"{fmt.format(median)} ({fmt.format(p10)} - {fmt.format(p90)},"
+        f" min {fmt.format(min(values))}, max {fmt.format(max(values))}, n={len(values)})"
+    )
+
+
+class Comparison(namedtuple("Comparison", "speedup low high pvalue")):
+    """Throughput of a new result relative to an old one.
+
+    `speedup` is 1.0 for no change, 0.9 for 10% less throughput. `low` and
+    `high` are the bounds of its confidence interval and `pvalue` is the
+    result of Welch's t-test on the (trimmed) runtimes.
+    """
+
+    def significant(self, alpha=0.05):
+        return self.pvalue < alpha
+
+    def regression(self, threshold=0.05, alpha=0.05):
+        """True if throughput dropped by more than `threshold` (significantly)."""
+        return self.significant(alpha) and self.speedup < 1 - threshold
+
+    def __str__(self):
+        return (
+            f"{self.speedup - 1:+.2%} [{self.low - 1:+.2%}, {self.high - 1:+.2%}]"
+            f" p={self.pvalue:.3f}"
+        )
+
+
+def compare(old, new, confidence_level=0.95):
+    """Compare two results of the same benchmark. Returns a `Comparison`.
+
+    The confidence interval of the speedup is computed on the log scale, with
+    Welch-Satterthwaite degrees of freedom.
+    """
+    a, b = old.trimmed_times, new.trimmed_times
+    if len(a) < 2 or len(b) < 2:
+        return None
+    pvalue = stats.ttest_ind(a, b, equal_var=False).pvalue
+    # Relative variance of both means, and the degrees of freedom for their sum
+    va = (old.stderr / old.avg) ** 2
+    vb = (new.stderr / new.avg) ** 2
+    df = (va + vb) ** 2 / (va**2 / (len(a) - 1) + vb**2 / (len(b) - 1)) if va + vb else 1
+    t = stats.t.ppf((1 + confidence_level) / 2, df=df)
+    speedup = old.avg / new.avg
+    margin = t * math.sqrt(va + vb)
+    return Comparison(
+        speedup,
+        speedup * math.exp(-margin),
+        speedup * math.exp(margin),
+        float(pvalue) if not math.isnan(pvalue) else 1.0,
+    )
@@ -0,0 +1,241 @@
+"""Parsers that consume the entire form, like a request handler would.
+
+The adapters in `parsers.py` discard fields and file contents as early as
+possible to measure parsing alone. Consumers build a name -> value dict with
+all text fields decoded to str, read every uploaded file back from its spool
+(memory or temporary file, depending on `SPOOL_LIMIT`) and close it. Results
+cover the whole lifetime of an upload, including spooling to disk.
+"""
+
+from tempfile import SpooledTemporaryFile
+
+from .parsers import SPOOL_LIMIT
+from .scenarios import Scenario
+
+CONSUMERS = []
+#: Block size for reading uploaded files back
+READ_SIZE = 2**16
+
+
+def add_consumer(func):
+    CONSUMERS.append(func)
+    return func
+
+
+def read_back(file):
+    """Read an uploaded file from the start, close it and return its size."""
+    file.seek(0)
+    read = file.read
+    size = 0
+    while chunk := read(READ_SIZE):
+        size += len(chunk)
+    file.close()
+    return size
+
+
+try:
+    import multipart
+
+    @add_consumer
+    def multipart_consume(scenario: Scenario):
+        form = {}
+        for part in multipart.MultipartParser(
+            scenario.payload,
+            boundary=scenario.boundary,
+            buffer_size=scenario.chunksize,
+            spool_limit=SPOOL_LIMIT,
+        ):
+            if part.filename is None:
+                form[part.name] = part.value
+            else:
+                form[part.name] = read_back(part.file)
+        return form
+
+except ImportError:
+    multipart_consume = None
+
+
+try:
+    from django.http.multipartparser import MultiPartParser
+    from django.core.files import uploadhandler
+    from django.conf import settings
+    from django.core.files.uploadhandler import MemoryFileUploadHandler
+
+    # Settings are configured in parsers.py
+    from .parsers import fake_request
+
+    @add_consumer
+    def django_consume(scenario: Scenario):
+        MemoryFileUploadHandler.chunk_size = scenario.chunksize
+        fields, files = MultiPartParser(
+            {
+                "CONTENT_TYPE": scenario.content_type,
+                "CONTENT_LENGTH": str(scenario.size),
+            },
+            scenario.payload,
+            [
+                uploadhandler.load_handler(handler, fake_request)
+                for handler in settings.FILE_UPLOAD_HANDLERS
+            ],
+            "utf8",
+        ).parse()
+        form = dict(fields.items())
+        for name, upload in files.items():
+            form[name] = read_back(upload)
+        return form
+
+except ImportError:
+    django_consume = None
+
+
+try:
+    import werkzeug.formparser as wstream
+
+    @add_consumer
+    def werkzeug_consume(scenario: Scenario):
+        parser = wstream.MultiPartParser(buffer_size=scenario.chunksize)
+        # Werkzeug decides between memory and a temporary file based on the
+        # content length of the entire request.
+        fields, files = parser.parse(scenario.payload, scenario.boundary, scenario.size)
+        form = dict(fields.items())
+        for name, storage in files.items():
+            form[name] = read_back(storage.stream)
+        return form
+
+except ImportError:
+    werkzeug_consume = None
+
+
+try:
+    import python_multipart
+
+    @add_consumer
+    def starlette_consume(scenario: Scenario):
+        form = {}
+        files = []
+
+        def on_field(field):
+            form[field.field_name.decode("utf8")] = (field.value or b"").decode("utf8")
+
+        parser = python_multipart.FormParser(
+            "multipart/form-data",
+            on_field,
+            files.append,
+            boundary=scenario.boundary,
+            config={"MAX_MEMORY_FILE_SIZE": SPOOL_LIMIT},
+        )
+        chunksize = scenario.chunksize
+        read = scenario.payload.read
+        for chunk in iter(lambda: read(chunksize), b""):
+            parser.write(chunk)
+        parser.finalize()
+
+        for file in files:
+            form[file.field_name.decode("utf8")] = read_back(file.file_object)
+        return form
+
+except ImportError:
+    starlette_consume = None
+
+
+try:
+    from streaming_form_data import StreamingFormDataParser
+    from streaming_form_data.targets import ValueTarget
+    from .parsers import SpooledTarget
+
+    @add_consumer
+    def streaming_consume(scenario: Scenario):
+        headers = {"Content-Type": scenario.content_type}
+        parser = StreamingFormDataParser(headers=headers)
+        values, files = {}, {}
+        for name, filename, *_ in scenario.fields:
+            target = SpooledTarget() if filename else ValueTarget()
+            (files if filename else values)[name] = target
+            parser.register(name, target)
+
+        chunksize = scenario.chunksize
+        read = scenario.payload.read
+        for chunk in iter(lambda: read(chunksize), b""):
+            parser.data_received(chunk)
+
+        form = {name: target.value.decode("utf8") for name, target in values.items()}
+        for name, target in files.items():
+            form[name] = read_back(target.file)
+        return form
+
+except ImportError:
+    streaming_consume = None
+
+
+try:
+    from emmett_core._emmett_core import MultiPartReader
+
+    @add_consumer
+    def emmett_consume(scenario: Scenario):
+        read = scenario.payload.read
+        chunksize = scenario.chunksize
+        parser = MultiPartReader(scenario.content_type)
+        for chunk in iter(lambda: read(chunksize), b""):
+            parser.parse(chunk)
+
+        form = {}
+        for name, is_file, value in parser.contents():
+            if not is_file:
+                form[name] = value.decode("utf8")
+                continue
+            # Spooled internally. File readers cannot be rewound or closed.
+            size = 0
+            while chunk := value.read(READ_SIZE):
+                size += len(chunk)
+            form[name] = size
+        return form
+
+except ImportError:
+    emmett_consume = None
+
+
+try:
+    import cgi
+
+    @add_consumer
+    def cgi_consume(scenario: Scenario):
+        fs = cgi.FieldStorage(
+            scenario.payload,
+            environ={
+                "REQUEST_METHOD": "POST",
+                "QUERY_STRING": "",
+                "CONTENT_TYPE": scenario.content_type,
+            },
+        )
+        form = {}
+        for item in fs.list:
+            if item.filename is None:
+                form[item.name] = item.value
+            else:
+                form[item.name] = read_back(item.file)
+        return form
+
+except ImportError:
+    cgi_consume = None
+
+
+from .parsers import email_sansio
+
+
+@add_consumer
+def email_consume(scenario: Scenario):
+    form = {}
+    for part in email_sansio(scenario):
+        name = part.get_param("name", header="content-disposition")
+        data = part.get_payload(decode=True)
+        if part.get_filename() is None:
+            form[name] = data.decode("utf8")
+        else:
+            # Same assumption as email_blocking: Files are spooled to disk
+            target = SpooledTemporaryFile(max_size=SPOOL_LIMIT)
+            target.write(data)
+            form[name] = read_back(target)
+    return form
+
+
+email_consume.in_memory = True
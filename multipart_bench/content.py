@@ -0,0 +1,78 @@
+from base64 import encodebytes
+
+import numpy as np
+
+GENERATORS = {}
+
+# A small vocabulary with some multi-byte UTF-8 characters, as found in
+# typical (European) user input.
+WORDS = (
+    "the of and to in is that for it as was with be by on not he this are or"
+    " his from at which but have an they you were her she there been one all"
+    " would their we him has when who will more no if out so said what up its"
+    " about into than them can only other new some could time these two may"
+    " first then do any like my now over such our man me even most made after"
+    " also did many before must through back years where much your way well"
+    " über Straße naïve café résumé déjà Ærø smörgåsbord façade jalapeño"
+    " Größe Fußgänger señor Zürich crème brûlée Ελλάδα Москва 東京 日本語 €"
+).split()
+
+
+def add_generator(func):
+    GENERATORS[func.__name__] = func
+    return func
+
+
+def generate(kind, size, seed=0):
+    """Generate `size` bytes of content of a specific kind (see GENERATORS)."""
+    return GENERATORS[kind](np.random.default_rng(seed), size)
+
+
+def _fit(data, size, fill=b" "):
+    """Cut or pad data to exactly `size` bytes."""
+    return data[:size] + fill * (size - len(data))
+
+
+@add_generator
+def binary(rng, size):
+    """Incompressible binary data, like JPEG images or zip files."""
+    header = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00"
+    return _fit(header + rng.bytes(max(0, size - len(header) - 2)) + b"\xff\xd9", size)
+
+
+@add_generator
+def text(rng, size):
+    """UTF-8 prose with sentences and line breaks."""
+    words = np.array([word.encode("utf8") for word in WORDS], dtype=object)
+    # Word frequencies roughly follow Zipf's law
+    weights = 1 / np.arange(1, len(words) + 1)
+    count = size // 5 + 1
+    tokens = np.empty(count * 2, dtype=object)
+    tokens[0::2] = rng.choice(words, count, p=weights / weights.sum())
+    separators = [b" ", b". ", b", ", b".\n"]
+    tokens[1::2] = rng.choice(separators, count, p=[0.85, 0.08, 0.05, 0.02])
+    data = b"".join(tokens.tolist())[:size]
+    # Do not cut multi-byte characters in half
+    data = data.decode("utf8", "ignore").encode("utf8")
+    return _fit(data, size)
+
+
+@add_generator
+def base64(rng, size):
+    """Base64 encoded binary data with 76 characters per line (like MIME)."""
+    return _fit(encodebytes(rng.bytes(size * 3 // 4 + 3)), size, b"=")
+
+
+@add_generator
+def csv(rng, size):
+    """CSV table with a header, numbers, dates and quoted text columns."""
+    rows = size // 40 + 1
+    names = rng.choice(WORDS, rows)
+    amounts = rng.lognormal(3, 2, rows)
+    days = rng.integers(0, 3650, rows) + np.datetime64("2015-01-01")
+    lines = ["id,name,amount,date,comment"]
+    lines += [
+        f'{i},{name},{amount:.2f},{day},"{name} {i % 7}"'
+        for i, name, amount, day in zip(range(rows), names, amounts, days)
+    ]
+    return _fit("\r\n".join(lines).encode("utf8"), size, b"\r\n")[:size]
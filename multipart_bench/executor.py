@@ -0,0 +1,86 @@
+import concurrent.futures
+import multiprocessing
+import time
+
+from .system import pin_to_cpu, select_cores
+
+
+def measure(
+    scenario, parser, n, null_func=None, sleeptime=0, sample=False, paired=False
+):
+    """Run a single benchmark batch. Used as the task function for executors.
+
+    Returns the average runtime, the average overhead (only in paired mode,
+    otherwise None), a list of per-iteration samples (or None) and the
+    wall-clock time the task took.
+    """
+    start = time.perf_counter()
+    # Build or map the payload (and source files) before anything is timed
+    scenario.prepare()
+    # Allow CPU to cool down
+    time.sleep(sleeptime)
+    samples = [] if sample else None
+    if paired and null_func:
+        result, overhead = scenario.run_paired(parser, null_func, n=n, samples=samples)
+    else:
+        result = scenario.run_bench(parser, n=n, null_func=null_func, samples=samples)
+        overhead = None
+    return result, overhead, samples, time.perf_counter() - start
+
+
+class SerialExecutor:
+    """Run benchmark tasks one after another in the current process."""
+
+    jobs = 1
+
+    def imap_unordered(self, func, tasks):
+        for args in tasks:
+            yield args, func(*args)
+
+    def shutdown(self):
+        pass
+
+
+def _init_worker(cores):
+    pin_to_cpu(cores.get())
+
+
+class PinnedExecutor:
+    """Run benchmark tasks in a pool of worker processes, one per CPU core.
+
+    Each worker is a fresh interpreter (spawned, not forked) and pinned to its
+    own core, so it behaves like a serial run with `taskset -c <core>`. Tasks
+    and their results must be picklable.
+    """
+
+    def __init__(self, cores):
+        self.cores = cores
+        self.jobs = len(cores)
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        for cpu in cores:
+            queue.put(cpu)
+        self.pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.jobs,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(queue,),
+        )
+
+    def imap_unordered(self, func, tasks):
+        futures = {self.pool.submit(func, *args): args for args in tasks}
+        for future in concurrent.futures.as_completed(futures):
+            yield futures[future], future.result()
+
+    def shutdown(self):
+        self.pool.shutdown()
+
+
+def create_executor(jobs):
+    """Return an executor for `jobs` parallel workers and a list of warnings."""
+    if jobs == 1:
+        return SerialExecutor(), []
+    cores, warnings = select_cores(jobs)
+    if len(cores) < 2:
+        return SerialExecutor(), warnings
+    return PinnedExecutor(cores), warnings
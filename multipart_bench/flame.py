@@ -0,0 +1,177 @@
+from collections import Counter
+import html
+import os
+import signal
+import zlib
+
+
+class StackSampler:
+    """Low-overhead statistical profiler for the main thread (Unix only).
+
+    A CPU time interval timer interrupts the interpreter every `interval`
+    seconds and the signal handler records the current Python stack. Unlike
+    cProfile, this does not slow down function calls, so hot loops keep their
+    usual performance characteristics.
+    """
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.samples = Counter()  # (code, ...) from leaf to root -> count
+
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+        self.samples[tuple(stack)] += 1
+
+    def start(self):
+        self._previous = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._previous)
+
+    def collapsed(self, root=None, lines=False):
+        """Samples as collapsed stacks ({"a;b;c": count}, root first).
+
+        If `root` is a code object, only frames called from it are kept (e.g.
+        to hide the benchmark harness). Samples outside of it are dropped.
+        See `frame_label` for `lines`.
+        """
+        stacks = Counter()
+        for stack, count in self.samples.items():
+            stack = stack[::-1]
+            if root is not None:
+                if root not in stack:
+                    continue
+                stack = stack[stack.index(root) + 1 :]
+            if stack:
+                label = ";".join(frame_label(code, lines) for code in stack)
+                stacks[label] += count
+        return stacks
+
+
+def frame_label(code, lines=False):
+    """Qualified function name and file name of a frame.
+
+    Line numbers are left out by default, so frames still match when stacks
+    of two versions of the same code are compared (see `flamediff.py`).
+    """
+    name = getattr(code, "co_qualname", code.co_name)
+    filename = os.path.basename(code.co_filename)
+    if lines:
+        return f"{name} ({filename}:{code.co_firstlineno})"
+    return f"{name} ({filename})"
+
+
+def write_collapsed(stacks, path):
+    with open(path, "w") as fp:
+        for stack, count in sorted(stacks.items()):
+            fp.write(f"{stack} {count}\n")
+
+
+def read_collapsed(path):
+    stacks = Counter()
+    with open(path, "r") as fp:
+        for line in fp:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            if stack:
+                stacks[stack] += int(count)
+    return stacks
+
+
+class Node:
+    def __init__(self, name):
+        self.name = name
+        self.value = 0
+        self.delta = 0
+        self.children = {}
+
+    def add(self, frames, value, delta=0):
+        self.value += value
+        self.delta += delta
+        if frames:
+            child = self.children.get(frames[0])
+            if child is None:
+                child = self.children[frames[0]] = Node(frames[0])
+            child.add(frames[1:], value, delta)
+
+
+def build_tree(stacks, baseline=None):
+    """Merge collapsed stacks into a tree.
+
+    With a `baseline`, each node also gets a `delta`: The difference in
+    samples compared to the baseline, scaled to the same total.
+    """
+    root = Node("all")
+    for stack, count in stacks.items():
+        root.add(stack.split(";"), count, count)
+    if baseline:
+        scale = sum(stacks.values()) / (sum(baseline.values()) or 1)
+        for stack, count in baseline.items():
+            root.add(stack.split(";"), 0, -count * scale)
+    return root
+
+
+def _color(node, total, diff):
+    if diff:
+        # Red for more samples than in the baseline, blue for fewer
+        change = max(-1.0, min(1.0, node.delta / (node.value or total) * 2))
+        fade = int(255 * (1 - abs(change)))
+        return f"rgb(255,{fade},{fade})" if change > 0 else f"rgb({fade},{fade},255)"
+    # Stable warm colors per function name
+    digest = zlib.crc32(node.name.encode("utf8"))
+    return f"rgb(230,{100 + digest % 130},{digest // 130 % 60})"
+
+
+def flamegraph_svg(stacks, path, title, baseline=None, width=1200):
+    """Render collapsed stacks as an SVG flame graph.
+
+    If `baseline` stacks are given, a differential flame graph is rendered:
+    Frame widths are taken from `stacks`, colors show the change compared to
+    the baseline (red: more time spent, blue: less time spent).
+    """
+    root = build_tree(stacks, baseline)
+    total = root.value or 1
+    height, top = 16, 40
+    rects = []
+
+    def layout(node, x, depth):
+        w = node.value / total * (width - 20)
+        if w < 0.5:
+            return
+        rects.append((node, x, depth, w))
+        for child in sorted(node.children.values(), key=lambda n: n.name):
+            layout(child, x, depth + 1)
+            x += child.value / total * (width - 20)
+
+    layout(root, 10, 0)
+    depth = max((d for _, _, d, _ in rects), default=0) + 1
+    svg_height = top + depth * height + 10
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{svg_height}"'
+        ' font-family="monospace" font-size="11">',
+        '<rect width="100%" height="100%" fill="#f8f8f8"/>',
+        f'<text x="{width / 2}" y="20" text-anchor="middle" font-size="14">'
+        f"{html.escape(title)}</text>",
+    ]
+    for node, x, d, w in rects:
+        y = svg_height - 10 - (d + 1) * height
+        share = node.value / total
+        tooltip = f"{node.name} ({node.value} samples, {share:.2%})"
+        if baseline:
+            tooltip += f", {node.delta / total:+.2%} compared to baseline"
+        label = node.name if len(node.name) * 7 < w else node.name[: int(w / 7) - 2]
+        out.append(
+            f'<g><title>{html.escape(tooltip)}</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{height - 1}"'
+            f' fill="{_color(node, total, baseline)}" rx="2"/>'
+        )
+        if w > 21:
+            out.append(f'<text x="{x + 3:.1f}" y="{y + 11}">{html.escape(label)}</text>')
+        out.append("</g>")
+    out.append("</svg>")
+    with open(path, "w") as fp:
+        fp.write("\n".join(out))
@@ -0,0 +1,23 @@
+"""Formatting of measured numbers for console output and the README."""
+
+
+def format_duration(seconds, sep=""):
+    """Duration in milliseconds or microseconds, e.g. "1.25ms" or "42.0µs".
+
+    `sep` goes between number and unit (e.g. " " for the README).
+    """
+    if seconds >= 0.001:
+        return f"{seconds * 1000:.2f}{sep}ms"
+    return f"{seconds * 1000 * 1000:.1f}{sep}µs"
+
+
+def format_speed(speed, unit="MB/s", sep=""):
+    """Throughput in MB/s or requests per second (see `Result.speed`)."""
+    if unit == "req/s":
+        return f"{speed:.0f}{sep}req/s"
+    return f"{speed:.2f}{sep}MB/s"
+
+
+def format_result_speed(scenario, result):
+    """Throughput of a result in the unit of its scenario."""
+    return format_speed(result.speed(scenario.unit), scenario.unit)
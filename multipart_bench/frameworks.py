@@ -0,0 +1,141 @@
+"""Form access through web frameworks, on top of the parsers they use.
+
+Each function builds a framework request object from a minimal WSGI environ
+or ASGI scope (no server, no network), accesses all form fields and files
+the way an application would, and closes the request. The `parser` attribute
+names an adapter (from `parsers.py` or this module) that does the same parsing
+work and builds the same form objects, so the difference between both results
+is the overhead of the framework. Both are measured against the same
+`null_func` baseline.
+"""
+
+import sys
+
+from .aio import AsyncBench, asgi_scope, dummy_asgi
+from .parsers import cgi_blocking, django_blocking, dummy_parser, werkzeug_blocking
+from .scenarios import Scenario
+
+FRAMEWORKS = []
+
+
+def add_framework(func, parser=None, null_func=dummy_parser):
+    func.parser = parser
+    func.null_func = null_func
+    FRAMEWORKS.append(func)
+    return func
+
+
+def wsgi_environ(scenario: Scenario):
+    """Minimal WSGI environ for a POST request with the scenario payload."""
+    return {
+        "REQUEST_METHOD": "POST",
+        "SCRIPT_NAME": "",
+        "PATH_INFO": "/",
+        "QUERY_STRING": "",
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "CONTENT_TYPE": scenario.content_type,
+        "CONTENT_LENGTH": str(scenario.size),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": scenario.payload,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": False,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+
+
+try:
+    import flask
+
+    def flask_request(scenario: Scenario):
+        request = flask.Request(wsgi_environ(scenario))
+        try:
+            list(request.form.lists())
+            list(request.files.lists())
+        finally:
+            request.close()
+
+    add_framework(flask_request, werkzeug_blocking)
+
+except ImportError:
+    flask_request = None
+
+
+try:
+    from django.core.handlers.wsgi import WSGIRequest
+
+    # Settings are configured in parsers.py (same spool limits as the adapters)
+
+    def django_request(scenario: Scenario):
+        request = WSGIRequest(wsgi_environ(scenario))
+        try:
+            list(request.POST.lists())
+            list(request.FILES.lists())
+        finally:
+            request.close()
+
+    add_framework(django_request, django_blocking)
+
+except ImportError:
+    django_request = None
+
+
+try:
+    import bottle
+
+    def bottle_request(scenario: Scenario):
+        request = bottle.BaseRequest(wsgi_environ(scenario))
+        list(request.forms.allitems())
+        list(request.files.allitems())
+
+    # Bottle 0.12 parses forms with cgi.FieldStorage, later versions have their
+    # own parser without a raw adapter to compare with.
+    add_framework(
+        bottle_request, cgi_blocking if bottle.__version__.startswith("0.12") else None
+    )
+
+except ImportError:
+    bottle_request = None
+
+
+try:
+    from starlette.datastructures import Headers
+    from starlette.formparsers import MultiPartParser as StarletteParser
+    from starlette.requests import Request as StarletteRequest
+
+    async def starlette_form(scenario: Scenario, receive):
+        request = StarletteRequest(asgi_scope(scenario), receive)
+        async with request.form() as form:
+            form.multi_items()
+
+    async def starlette_formparser(scenario: Scenario, receive):
+        # Same parser and form objects (UploadFile, spooled to disk) as
+        # request.form(), without the request object.
+        async def stream():
+            while True:
+                message = await receive()
+                yield message["body"]
+                if not message["more_body"]:
+                    break
+
+        headers = Headers(scope=asgi_scope(scenario))
+        form = await StarletteParser(headers, stream()).parse()
+        form.multi_items()
+        await form.close()
+
+    # Runs on an event loop and receives the body via ASGI receive() calls, so
+    # it is compared with Starlette's form parser and the async baseline. The
+    # raw starlette_asgi adapter does not build any form objects.
+    starlette_request = AsyncBench(starlette_form)
+    starlette_request.__name__ = "starlette_request"
+    add_framework(
+        starlette_request,
+        AsyncBench(starlette_formparser),
+        null_func=AsyncBench(dummy_asgi),
+    )
+
+except ImportError:
+    starlette_request = None
@@ -0,0 +1,155 @@
+import json
+import sqlite3
+import sys
+import time
+
+from .parsers import parser_package
+from .scenarios import Result
+from .system import (
+    host_fingerprint,
+    host_info,
+    interpreter_info,
+    package_version,
+    python_version,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    python TEXT NOT NULL,
+    interpreter TEXT NOT NULL,
+    host TEXT NOT NULL,
+    host_info TEXT NOT NULL,
+    profile TEXT,
+    argv TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    scenario TEXT NOT NULL,
+    parser TEXT NOT NULL,
+    package TEXT,
+    version TEXT,
+    size INTEGER NOT NULL,
+    times TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_name ON results (name, run_id);
+"""
+
+
+def parser_version(package):
+    """Version of the package that provides a parser.
+
+    Parsers from the standard library (e.g. `cgi` or `email`) are versioned
+    with the interpreter.
+    """
+    if package is None:
+        return None
+    if package in sys.stdlib_module_names:
+        return f"python-{python_version()}"
+    return package_version(package)
+
+
+class History:
+    """SQLite store that keeps the raw times of every benchmark run.
+
+    Each run is recorded with the interpreter, a host fingerprint, the
+    benchmark profile and the versions of all parser packages, so results
+    can be compared across releases without re-running old benchmarks.
+    """
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def start_run(self, profile=None, argv=None):
+        """Record a new run with metadata about this process. Returns its id."""
+        info = host_info()
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO runs (started, python, interpreter, host, host_info,"
+                " profile, argv) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    time.time(),
+                    python_version(),
+                    json.dumps(interpreter_info()),
+                    host_fingerprint(info),
+                    json.dumps(info),
+                    profile,
+                    json.dumps(argv or []),
+                ),
+            )
+        return cursor.lastrowid
+
+    def record(self, run_id, scenario, parser, result, times=None):
+        """Store the times of a result (or just `times`, e.g. new samples).
+
+        Results without times are not stored, because `query` would report
+        them instead of earlier results of the same version.
+        """
+        times = result.times if times is None else times
+        if not times:
+            return
+        package = parser_package(parser)
+        with self.db:
+            self.db.execute(
+                "INSERT INTO results (run_id, name, scenario, parser, package,"
+                " version, size, times) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    result.name,
+                    scenario.name,
+                    parser.__name__,
+                    package,
+                    parser_version(package),
+                    result.size,
+                    json.dumps(times),
+                ),
+            )
+
+    def query(self, name, host=None, python=None, releases=None):
+        """Results of a benchmark, one per parser version (the latest run).
+
+        Returns a list of (row, Result) tuples ordered from old to new, where
+        `row` has the run metadata. `releases` limits the result to the most
+        recent N parser versions.
+        """
+        sql = (
+            "SELECT results.*, runs.started, runs.python, runs.host, runs.profile"
+            " FROM results JOIN runs ON runs.id = results.run_id"
+            " WHERE name = ? AND times != '[]'"
+        )
+        params = [name]
+        if host:
+            sql += " AND runs.host = ?"
+            params.append(host)
+        if python:
+            sql += " AND runs.python = ?"
+            params.append(python)
+        latest = {}
+        for row in self.db.execute(sql + " ORDER BY runs.started", params):
+            latest[row["version"]] = row
+        rows = sorted(latest.values(), key=lambda row: row["started"])
+        if releases:
+            rows = rows[-releases:]
+        return [
+            (row, Result(row["name"], row["size"], json.loads(row["times"])))
+            for row in rows
+        ]
+
+    def run_results(self, run_id):
+        """All results of a single run, by benchmark name."""
+        return {
+            row["name"]: Result(row["name"], row["size"], json.loads(row["times"]))
+            for row in self.db.execute(
+                "SELECT * FROM results WHERE run_id = ?", (run_id,)
+            )
+        }
+
+    def names(self):
+        return [row[0] for row in self.db.execute("SELECT DISTINCT name FROM results")]
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,77 @@
+from collections import namedtuple
+import random
+import time
+
+import numpy as np
+
+from .scenarios import get_scenario
+
+
+def parse_mix(text):
+    """Parse a traffic mix like "simple=80,mixed=15,upload=5".
+
+    Returns a list of (scenario, weight) tuples. Weights are relative and do
+    not need to add up to 100.
+    """
+    mix = []
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix.append((get_scenario(name.strip()), float(weight or 1)))
+    return mix
+
+
+def schedule(mix, count, seed=0):
+    """Random but reproducible sequence of `count` scenarios drawn from a mix."""
+    scenarios = [scenario for scenario, _ in mix]
+    weights = [weight for _, weight in mix]
+    return random.Random(seed).choices(scenarios, weights, k=count)
+
+
+class MixResult(namedtuple("MixResult", "name time requests bytes latencies")):
+    """Aggregated results of one or more runs of a request sequence.
+
+    `latencies` maps scenario names to per-request runtimes (in seconds).
+    """
+
+    @property
+    def requests_per_second(self):
+        return self.requests / self.time
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes / self.time
+
+    def latency(self, scenario, percentile):
+        return float(np.percentile(self.latencies[scenario], percentile))
+
+    def merge(self, other):
+        latencies = {
+            name: self.latencies.get(name, []) + other.latencies.get(name, [])
+            for name in {**self.latencies, **other.latencies}
+        }
+        return MixResult(
+            self.name,
+            self.time + other.time,
+            self.requests + other.requests,
+            self.bytes + other.bytes,
+            latencies,
+        )
+
+
+def run_mix(parser, requests):
+    """Run a sequence of requests (scenarios) back to back with the same parser.
+
+    Unlike `Scenario.run_bench`, garbage collection stays enabled and different
+    request types are interleaved, so cache and GC interference between them
+    is part of the result.
+    """
+    timer = time.perf_counter
+    latencies = {}
+    start = timer()
+    for scenario in requests:
+        begin = timer()
+        scenario.run_once(parser)
+        latencies.setdefault(scenario.name, []).append(timer() - begin)
+    elapsed = timer() - start
+    size = sum(scenario.size for scenario in requests)
+    return MixResult(parser.__name__, elapsed, len(requests), size, latencies)
@@ -25,6 +25,12 @@ def dummy_parser(scenario: Scenario):
         pass
 
 
+# Parsers with a `buffers` attribute accept memoryview chunks from read() and
+# are measured without a copy per chunk if the payload supports it (see
+# `sources.open_view`). All other parsers get bytes.
+dummy_parser.buffers = True
+
+
 try:
     import multipart
 
@@ -67,6 +73,8 @@ try:
         FILE_UPLOAD_MAX_MEMORY_SIZE=SPOOL_LIMIT,
         DATA_UPLOAD_MAX_MEMORY_SIZE=SPOOL_LIMIT,
     )
+    # Module-level state shared by all threads. Handler classes are also
+    # reconfigured per call (chunk_size), which is not thread-safe.
     fake_request = HttpRequest()
     handers = [
         MemoryFileUploadHandler(fake_request),
@@ -117,6 +125,8 @@ try:
         parser = wstream.MultiPartParser(buffer_size=scenario.chunksize)
         parser.parse(scenario.payload, scenario.boundary, -1)
 
+    werkzeug_sansio.buffers = werkzeug_blocking.buffers = True
+
 except ImportError:
     werkzeug_sansio = None
     werkzeug_blocking = None
@@ -229,6 +239,8 @@ except ImportError:
 try:
     from emmett_core._emmett_core import MultiPartReader
 
+    # Also accepts memoryview chunks, but converts them element by element,
+    # which is much slower than bytes. Not marked with `buffers` for that reason.
     @add_parser
     def emmett_blocking(scenario: Scenario):
         read = scenario.payload.read
@@ -278,6 +290,9 @@ def email_sansio(scenario: Scenario):
     return parser.close().get_payload()
 
 
+email_sansio.in_memory = True
+
+
 # Payload is always memory-buffered, which makes this parser unsuitable for
 # large file uploads and unsafe to use in a web application. To get comparable
 # results for a blocking version, we assume that someone subclasses Message
@@ -292,6 +307,9 @@ def email_blocking(scenario: Scenario):
         target.close()
 
 
+email_blocking.in_memory = True
+
+
 parser_table = {
     "multipart": [multipart_blocking, multipart_sansio],
     "python-multipart": [starlette_blocking, starlette_sansio],
@@ -302,3 +320,16 @@ parser_table = {
     "email": [email_blocking, email_sansio],
     "emmett-core": [emmett_blocking, None],
 }
+
+
+def parser_package(parser):
+    """Name of the package (see `parser_table`) that provides a parser.
+
+    Also works for wrapped parsers and async adapters, as long as their name
+    starts with the same prefix (e.g. `werkzeug_asgi@tasks=16`).
+    """
+    prefix = getattr(parser, "func", parser).__name__.split("_")[0]
+    for package, variants in parser_table.items():
+        if any(v and v.__name__.split("_")[0] == prefix for v in variants):
+            return package
+    return None
@@ -0,0 +1,131 @@
+import ctypes
+import fcntl
+import os
+import platform
+import struct
+
+PERF_TYPE_HARDWARE = 0
+PERF_TYPE_SOFTWARE = 1
+PERF_TYPE_HW_CACHE = 3
+
+PERF_EVENT_IOC_ENABLE = 0x2400
+PERF_EVENT_IOC_DISABLE = 0x2401
+PERF_EVENT_IOC_RESET = 0x2403
+
+PERF_FORMAT_TOTAL_TIME_ENABLED = 1
+PERF_FORMAT_TOTAL_TIME_RUNNING = 2
+
+# disabled, inherit, exclude_kernel and exclude_hv bits. Counting user space
+# only works with the default perf_event_paranoid setting (2). Inherited
+# counters also count threads started after the counter was opened (e.g. the
+# worker threads of `threads.ThreadBench`).
+FLAGS = 1 << 0 | 1 << 1 | 1 << 5 | 1 << 6
+
+SYSCALLS = {"x86_64": 298, "aarch64": 241, "armv7l": 364, "ppc64le": 319}
+
+
+def _cache(cache, op=0, result=1):
+    """Config for PERF_TYPE_HW_CACHE (default: read misses)."""
+    return cache | op << 8 | result << 16
+
+
+#: Name -> (type, config)
+COUNTERS = {
+    "instructions": (PERF_TYPE_HARDWARE, 1),
+    "cycles": (PERF_TYPE_HARDWARE, 0),
+    "branch_misses": (PERF_TYPE_HARDWARE, 5),
+    "l1d_misses": (PERF_TYPE_HW_CACHE, _cache(0)),
+    "llc_misses": (PERF_TYPE_HW_CACHE, _cache(2)),
+    "page_faults": (PERF_TYPE_SOFTWARE, 2),
+}
+
+
+class perf_event_attr(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_uint32),
+        ("size", ctypes.c_uint32),
+        ("config", ctypes.c_uint64),
+        ("sample_period", ctypes.c_uint64),
+        ("sample_type", ctypes.c_uint64),
+        ("read_format", ctypes.c_uint64),
+        ("flags", ctypes.c_uint64),
+        ("wakeup_events", ctypes.c_uint32),
+        ("bp_type", ctypes.c_uint32),
+        ("config1", ctypes.c_uint64),
+        ("config2", ctypes.c_uint64),
+        ("branch_sample_type", ctypes.c_uint64),
+        ("sample_regs_user", ctypes.c_uint64),
+        ("sample_stack_user", ctypes.c_uint32),
+        ("clockid", ctypes.c_int32),
+        ("sample_regs_intr", ctypes.c_uint64),
+        ("aux_watermark", ctypes.c_uint32),
+        ("sample_max_stack", ctypes.c_uint16),
+        ("reserved", ctypes.c_uint16),
+    ]
+
+
+def perf_event_open(type, config):
+    """Open a counter for the calling thread and all threads it starts later.
+
+    Returns a file descriptor.
+    """
+    number = SYSCALLS.get(platform.machine())
+    if number is None or platform.system() != "Linux":
+        raise OSError(f"perf_event_open is not supported on {platform.machine()}")
+    attr = perf_event_attr(
+        type=type,
+        size=ctypes.sizeof(perf_event_attr),
+        config=config,
+        read_format=PERF_FORMAT_TOTAL_TIME_ENABLED | PERF_FORMAT_TOTAL_TIME_RUNNING,
+        flags=FLAGS,
+    )
+    libc = ctypes.CDLL(None, use_errno=True)
+    fd = libc.syscall(number, ctypes.byref(attr), 0, -1, -1, 0)
+    if fd < 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+    return fd
+
+
+class PerfCounters:
+    """Hardware counters of the current thread, started and stopped together.
+
+    Threads started after the counters were created are counted as well.
+
+    Counters that are not supported (e.g. in virtual machines or containers,
+    or with a restrictive `kernel.perf_event_paranoid` setting) are skipped
+    and listed in `unavailable` with the reason.
+    """
+
+    def __init__(self, names=None):
+        self.fds = {}
+        self.unavailable = {}
+        for name in names or COUNTERS:
+            try:
+                self.fds[name] = perf_event_open(*COUNTERS[name])
+            except OSError as e:
+                self.unavailable[name] = e.strerror or str(e)
+
+    def start(self):
+        for fd in self.fds.values():
+            fcntl.ioctl(fd, PERF_EVENT_IOC_RESET, 0)
+        for fd in self.fds.values():
+            fcntl.ioctl(fd, PERF_EVENT_IOC_ENABLE, 0)
+
+    def stop(self):
+        """Stop counting and return counts by name.
+
+        Counts are scaled up if the kernel had to multiplex counters.
+        """
+        for fd in self.fds.values():
+            fcntl.ioctl(fd, PERF_EVENT_IOC_DISABLE, 0)
+        counts = {}
+        for name, fd in self.fds.items():
+            value, enabled, running = struct.unpack("QQQ", os.read(fd, 24))
+            counts[name] = value * enabled / running if running else 0
+        return counts
+
+    def close(self):
+        for fd in self.fds.values():
+            os.close(fd)
+        self.fds = {}
@@ -1,31 +1,423 @@
 from collections import namedtuple
+import contextlib
 import io
+import os
 import math
+import mmap
+import time
 import timeit
 import string
 import json
 import gc
+import random
+import hashlib
+import inspect
+import sys
+import tempfile
+import tracemalloc
+import numpy as np
 from scipy import stats
 
+from .content import generate
+from .system import current_rss, peak_rss, reset_peak_rss, written_bytes
+
+#: Increment this whenever payload generation changes in a way that is not
+#: visible in the builder source of a scenario (e.g. changes to `pattern` or
+#: to the content generators).
+GENERATOR_VERSION = 2
+
+#: Generated payloads are cached in this directory, so repeated runs and worker
+#: processes load them instead of building them again. Set the environment
+#: variable to an empty string to always build payloads in memory.
+CACHE_DIR = os.environ.get("MULTIPART_BENCH_CACHE", "var/cache")
+
+
+SIZE_SUFFIXES = {"": 1, "k": 2**10, "m": 2**20, "g": 2**30}
+
+
+def parse_size(text):
+    """Parse a size with an optional binary suffix (e.g. "64", "4k" or "1m")."""
+    text = text.strip().lower().removesuffix("b")
+    number, suffix = (text[:-1], text[-1]) if text[-1:] in SIZE_SUFFIXES else (text, "")
+    return int(float(number) * SIZE_SUFFIXES[suffix])
+
+
+def format_size(size):
+    """Shortest exact representation of a size, e.g. 4096 -> "4k"."""
+    for suffix in ("g", "m", "k"):
+        if size >= SIZE_SUFFIXES[suffix] and size % SIZE_SUFFIXES[suffix] == 0:
+            return f"{size // SIZE_SUFFIXES[suffix]}{suffix}"
+    return str(size)
+
+
+@contextlib.contextmanager
+def gc_disabled():
+    """Collect garbage, then disable the collector like timeit does."""
+    gc.collect()
+    gcold = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if gcold:
+            gc.enable()
+
+
+class MappedPayload(mmap.mmap):
+    """Read-only memory map of a cached payload, usable as a binary stream."""
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "rb") as fp:
+            return cls(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def readable(self):
+        return True
+
+    def readline(self, size=-1):
+        if size is None or size < 0:
+            return super().readline()
+        pos = self.tell()
+        end = self.find(b"\n", pos, pos + size)
+        return self.read(size if end < 0 else end - pos + 1)
+
+    # A bare mmap iterates over every single byte of the whole map. Behave like
+    # a binary file instead and yield lines from the current position, because
+    # some parsers (e.g. django) read their input to the end by iterating it.
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+
+class PatternStream:
+    """Binary stream that generates its content on the fly while reading.
+
+    Content is stored as a list of literal or repeated byte patterns and
+    produced by a generator on `read`, so memory usage does not depend on the
+    total stream size. Used for payloads that are too large to materialize.
+    """
+
+    BLOCKSIZE = 1024 * 1024
+
+    def __init__(self):
+        self._segments = []  # [(block, period, size)], period is None for literals
+        self._size = 0
+        self.seek(0)
+
+    def readable(self):
+        return True
+
+    def write(self, data):
+        size = len(data)
+        if self._segments and self._segments[-1][1] is None:
+            # Merge consecutive literals
+            data = self._segments.pop()[0] + data
+        self._segments.append((bytes(data), None, len(data)))
+        self._size += size
+        self.seek(self._size)
+        return size
+
+    def repeat(self, pattern, size):
+        period = len(pattern)
+        count = -(-(min(size, self.BLOCKSIZE) + period) // period)
+        self._segments.append((pattern * count, period, size))
+        self._size += size
+        self.seek(self._size)
+
+    def _generate(self, pos):
+        start = 0
+        for block, period, size in self._segments:
+            end = start + size
+            while pos < end:
+                if period:
+                    offset = (pos - start) % period
+                    n = min(end - pos, self.BLOCKSIZE)
+                else:
+                    offset = pos - start
+                    n = end - pos
+                yield block, offset, offset + n
+                pos += n
+            start = end
+
+    def _next(self):
+        window, self._window = self._window, None
+        return window or next(self._windows, None)
+
+    def seek(self, pos, whence=0):
+        if whence == 1:
+            pos += self._pos
+        elif whence == 2:
+            pos += self._size
+        self._pos = pos
+        self._windows = self._generate(pos)
+        self._window = None
+        return pos
+
+    def tell(self):
+        return self._pos
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self._size - self._pos
+        parts = []
+        while size > 0:
+            window = self._next()
+            if window is None:
+                break
+            block, start, end = window
+            if end - start > size:
+                self._window = (block, start + size, end)
+                end = start + size
+            parts.append(memoryview(block)[start:end])
+            size -= end - start
+            self._pos += end - start
+        return b"".join(parts)
+
+    def readline(self, size=-1):
+        if size is None:
+            size = -1
+        parts = []
+        while size != 0:
+            window = self._next()
+            if window is None:
+                break
+            block, start, end = window
+            stop = end if size < 0 else min(end, start + size)
+            newline = block.find(b"\n", start, stop)
+            if newline >= 0:
+                stop = newline + 1
+            if stop < end:
+                self._window = (block, stop, end)
+            parts.append(memoryview(block)[start:stop])
+            self._pos += stop - start
+            if size > 0:
+                size -= stop - start
+            if newline >= 0:
+                break
+        return b"".join(parts)
+
+    def clone(self):
+        """New stream with the same content and its own read position."""
+        clone = object.__new__(type(self))
+        clone._segments = self._segments
+        clone._size = self._size
+        clone.seek(0)
+        return clone
+
+    def close(self):
+        pass
+
+
+class ViewReader:
+    """Reader that returns `memoryview` slices of a buffer instead of copies.
+
+    File-like payloads allocate and copy a new bytes object per read(), which
+    is part of the overhead subtracted from each result. Parsers that accept
+    buffers (see `buffers` attribute) can read without that copy. Others get
+    bytes (`views=False`). The buffer must support `find()` (bytes or mmap).
+    """
+
+    def __init__(self, data, views=True):
+        self._data = data
+        self._view = memoryview(data)
+        self._views = views
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seek(self, pos, whence=0):
+        if whence == 1:
+            pos += self._pos
+        elif whence == 2:
+            pos += len(self._view)
+        self._pos = max(0, pos)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def read(self, size=-1):
+        start = self._pos
+        end = len(self._view) if size is None or size < 0 else start + size
+        self._pos = min(end, len(self._view))
+        if self._views:
+            return self._view[start:end]
+        return self._data[start:end]
+
+    def readline(self, size=-1):
+        start = self._pos
+        end = self._data.find(b"\n", start) + 1 or len(self._view)
+        if size is not None and size >= 0:
+            end = min(end, start + size)
+        self._pos = end
+        return self._data[start:end]
+
+
+class TimedReader:
+    """Stream wrapper that records when its consumer reads.
+
+    The time between one read returning and the next read being called is the
+    time the consumer (the parser) spent processing the previous chunk.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self.marks = []  # [(read called, read returned)]
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        called = time.perf_counter()
+        data = self._stream.read(size)
+        self.marks.append((called, time.perf_counter()))
+        return data
+
+    def intervals(self, end):
+        """Processing time after each read, up to the next read or `end`."""
+        calls = [called for called, _ in self.marks[1:]] + [end]
+        return [call - returned for (_, returned), call in zip(self.marks, calls)]
+
 
 class Scenario:
     def __init__(
         self,
         name,
         description,
+        builder=None,
         boundary=b"------------------------WqclBHaXe8KIsoSum4zfZ6",
         chunksize=2**16,
+        default=True,
+        unit="MB/s",
+        family=0,
     ):
         self.name = name
         self.description = description
+        self.builder = builder
         self.boundary = boundary
-        self.payload = io.BytesIO()
-        self._seek = self.payload.seek
+        #: Builders may change `boundary` (see `random_form`). The cache key
+        #: uses the one the scenario was defined with.
+        self._defined_boundary = boundary
         self.chunksize = chunksize
+        #: Scenarios that are not part of the default benchmark set must be
+        #: selected explicitly (e.g. because they take very long to run).
+        self.default = default
+        #: Small forms are reported in requests per second ("req/s") instead
+        #: of throughput ("MB/s").
+        self.unit = unit
+        #: Randomly generated scenarios are run with this many different seeds
+        #: (see `random_form`).
+        self.family = family
+        #: Read the payload through a real I/O source instead of from memory
+        #: (see `sources.SOURCES`), e.g. "socket" or "pipe".
+        self.source = None
+
+        #: Attributes that differ from the registered scenario (see `variant`)
+        self.overrides = {}
+        #: Keyword arguments for the builder (e.g. `size`)
+        self.params = {}
 
         self.fields = []  # [[name, filename, headers, size]]
+        self._payload = None
+
+    def prepare(self):
+        """Build the payload on first use. Returns the scenario itself."""
+        if self._payload is None:
+            key = self.cache_key() if CACHE_DIR else None
+            if key:
+                self._load_cached(key) or self._build_cached(key)
+            else:
+                self._build(io.BytesIO())
+            self._seek = self._payload.seek
+        if self.source and "_source_path" not in self.__dict__:
+            self._prepare_source()
+        return self
+
+    def _prepare_source(self):
+        from .sources import prepare_source
+
+        self._source_path = None  # Set first, prepare_source() reads the payload
+        prepare_source(self)
+
+    def cache_key(self):
+        """Content address of the generated payload, or None if not cacheable.
+
+        Derived from the definition only (builder, boundary, parameters), not
+        from state the builder changes, so all processes agree on it.
+        """
+        try:
+            source = inspect.getsource(self.builder) if self.builder else ""
+        except (OSError, TypeError):
+            return None
+        definition = [GENERATOR_VERSION, self._defined_boundary.decode("latin1"), source]
+        if self.params:
+            definition.append(self.params)
+        digest = hashlib.sha256(json.dumps(definition).encode("utf8")).hexdigest()
+        return f"{self.name}-{digest[:24]}"
+
+    def _build(self, fp):
+        self._payload = fp
+        self.fields = []
         self._in_body = False
         self._end_written = False
+        if self.builder:
+            self.builder(self, **self.params)
+        self.end()
+
+    def _load_cached(self, key):
+        path = os.path.join(CACHE_DIR, key)
+        try:
+            with open(f"{path}.json", "r") as fp:
+                meta = json.load(fp)
+            # Parsers read from a BytesIO like with built payloads. A map would
+            # run readline() and iteration in Python and skew the results.
+            with MappedPayload.from_file(f"{path}.bin") as mapping:
+                self._payload = io.BytesIO(mapping)
+        except FileNotFoundError:
+            return False
+        self.fields = meta["fields"]
+        self._size = meta["size"]
+        self.boundary = meta.get("boundary", self.boundary.decode("latin1")).encode("latin1")
+        return True
+
+    def _build_cached(self, key):
+        # Build into temporary files and move them in place, so concurrent
+        # workers never see partially written payloads.
+        path = os.path.join(CACHE_DIR, key)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=CACHE_DIR, delete=False) as fp:
+            self._build(fp)
+        os.replace(fp.name, f"{path}.bin")
+        with tempfile.NamedTemporaryFile("w", dir=CACHE_DIR, delete=False) as fp:
+            meta = {"size": self._size, "fields": self.fields}
+            meta["boundary"] = self.boundary.decode("latin1")
+            json.dump(meta, fp)
+        os.replace(fp.name, f"{path}.json")
+        self._load_cached(key)
+
+    def release(self):
+        """Free the payload. It is built again the next time it is needed."""
+        self._payload = None
+        self._seek = None
+
+    @property
+    def payload(self):
+        return self.prepare()._payload
+
+    @property
+    def size(self):
+        return self.prepare()._size
+
+    @size.setter
+    def size(self, value):
+        self._size = value
 
     @property
     def content_type(self):
@@ -33,6 +425,7 @@ class Scenario:
 
     @property
     def fieldnames(self):
+        self.prepare()
         return [field[0] for field in self.fields]
 
     def write(self, data):
@@ -79,6 +472,15 @@ class Scenario:
             self.write(pattern[: size % plen])
         return self
 
+    def content(self, kind, size, seed=0):
+        """Write generated content, e.g. "binary", "text", "base64" or "csv".
+
+        See `content.GENERATORS` for all kinds. Content is random, but the same
+        for the same seed.
+        """
+        self.write(generate(kind, int(size), seed))
+        return self
+
     def end(self):
         if not self._end_written:
             self._end_written = True
@@ -86,24 +488,273 @@ class Scenario:
             self.size = self.payload.tell()
         return self
 
+    def __reduce__(self):
+        # Registered scenarios are deterministic, so worker processes can look
+        # them up by name instead of receiving a copy of the payload.
+        return get_scenario, (self.name, self.overrides)
+
+    def open(self):
+        """Open a new reader for the payload with its own read position."""
+        payload = self.prepare()._payload
+        if isinstance(payload, PatternStream):
+            return payload.clone()
+        if not isinstance(payload, io.BytesIO):
+            raise TypeError(f"Cannot open another reader for {type(payload).__name__}")
+        return io.BytesIO(payload.getvalue())
+
+    def clone(self):
+        """Copy of this scenario with its own reader, e.g. for concurrent use."""
+        payload = self.open()
+        return self.copy(_payload=payload, _seek=payload.seek)
+
+    def copy(self, **attrs):
+        """Shallow copy with optional attribute changes. Shares the payload."""
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.__dict__.update(attrs)
+        return clone
+
+    #: Short labels for variant attributes in benchmark names
+    VARIANT_LABELS = {"chunksize": "chunk"}
+    #: Variant attributes that are formatted as sizes (e.g. "4k")
+    VARIANT_SIZES = {"chunksize", "size"}
+
+    @property
+    def parameters(self):
+        """Optional builder arguments and their defaults (e.g. `size`)."""
+        if not self.builder:
+            return {}
+        parameters = list(inspect.signature(self.builder).parameters.values())[1:]
+        return {p.name: p.default for p in parameters}
+
+    def variant(self, **overrides):
+        """Copy of this scenario with different attributes or builder arguments.
+
+        Attributes that only change how the payload is read (e.g. `chunksize`)
+        share the payload. Builder arguments (see `parameters`) build a new one.
+        Results of variants are stored under their own names, with a suffix
+        like `@chunk=4k` or `@size=64m` (see `name_for`).
+        """
+        overrides = {**self.overrides, **overrides}
+        parameters = self.parameters
+        params = {k: v for k, v in overrides.items() if k in parameters}
+        attrs = {k: v for k, v in overrides.items() if k not in parameters}
+        if params != self.params:
+            attrs.update(_payload=None, _seek=None, fields=[])
+        return self.copy(overrides=overrides, params=params, **attrs)
+
+    @property
+    def suffix(self):
+        return "".join(
+            f"@{self.VARIANT_LABELS.get(key, key)}="
+            + (format_size(value) if key in self.VARIANT_SIZES else str(value))
+            for key, value in sorted(self.overrides.items())
+        )
+
     def name_for(self, func):
-        return f"{self.name}-{func.__name__}"
+        return f"{self.name}-{func.__name__}{self.suffix}"
 
     def run_once(self, func):
-        self._seek(0)
+        if self.source:
+            from .sources import SOURCES
+
+            self.prepare()
+            with SOURCES[self.source](self, func) as reader:
+                func(self.copy(_payload=reader))
+            return
+        self.prepare()._seek(0)
         func(self)
 
-    def run_bench(self, func, n=1, null_func=None):
+    #: Maximum number of per-iteration samples kept from a single batch
+    SAMPLE_LIMIT = 1000
+
+    def run_bench(self, func, n=1, null_func=None, samples=None):
+        """Return the average runtime of `n` runs, minus the `null_func` overhead.
+
+        Functions that process more than one request per call (see `requests`
+        attribute) are reported as time per request. If `samples` is a list,
+        each run is timed individually and a random selection of per-run times
+        is appended to it.
+        """
+        if samples is not None:
+            return self._run_bench_samples(func, n, null_func, samples)
         gc.collect()
-        time = timeit.timeit(lambda: self.run_once(func), "pass", number=n) / n
+        time = timeit.timeit(lambda: self.run_once(func), "pass", number=n)
+        time /= n * getattr(func, "requests", 1)
         if null_func:
-            time -= (
-                timeit.timeit(lambda: self.run_once(null_func), "pass", number=n) / n
-            )
+            overhead = timeit.timeit(lambda: self.run_once(null_func), "pass", number=n)
+            time -= overhead / (n * getattr(null_func, "requests", 1))
         return time
 
+    def _time_each(self, func, n):
+        timer = time.perf_counter
+        run_once = self.run_once
+        requests = getattr(func, "requests", 1)
+        times = []
+        with gc_disabled():
+            for _ in range(n):
+                start = timer()
+                run_once(func)
+                times.append((timer() - start) / requests)
+        return times
+
+    def _run_bench_samples(self, func, n, null_func, samples):
+        times = self._time_each(func, n)
+        # Null runs are timed the same way, so timer overhead cancels out
+        overhead = sum(self._time_each(null_func, n)) / n if null_func else 0
+        times = [t - overhead for t in times]
+        samples.extend(random.sample(times, min(n, self.SAMPLE_LIMIT)))
+        return sum(times) / n
+
+    def run_paired(self, func, null_func, n=1, samples=None):
+        """Alternate runs of `func` and `null_func` and time each of them.
+
+        Each run of `func` is paired with a run of `null_func` right before or
+        after it (in alternating order), so frequency drift or other slow
+        changes affect both equally. Returns the average paired difference and
+        the average overhead per request. If `samples` is a list, a random
+        selection of paired differences is appended to it.
+        """
+        timer = time.perf_counter
+        run_once = self.run_once
+        requests = getattr(func, "requests", 1)
+        null_requests = getattr(null_func, "requests", 1)
+        diffs, overheads = [], []
+        with gc_disabled():
+            for i in range(n):
+                first, second = (func, null_func) if i % 2 == 0 else (null_func, func)
+                start = timer()
+                run_once(first)
+                middle = timer()
+                run_once(second)
+                end = timer()
+                if i % 2 == 0:
+                    runtime, overhead = middle - start, end - middle
+                else:
+                    runtime, overhead = end - middle, middle - start
+                overhead /= null_requests
+                diffs.append(runtime / requests - overhead)
+                overheads.append(overhead)
+        if samples is not None:
+            samples.extend(random.sample(diffs, min(n, self.SAMPLE_LIMIT)))
+        return sum(diffs) / n, sum(overheads) / n
+
+    def run_latency(self, func):
+        """Run once and return the time spent processing each chunk.
+
+        Only meaningful for non-blocking parsers that read exactly one chunk
+        per feed call. The last value covers everything after the last read
+        (e.g. finalizing the parser).
+        """
+        self.prepare()._seek(0)
+        reader = TimedReader(self._payload)
+        func(self.copy(_payload=reader))
+        return reader.intervals(time.perf_counter())
+
+    def run_counters(self, func, counters, n=1, null_func=None):
+        """Count hardware events (see `perf.PerfCounters`) during `n` runs.
+
+        Returns counts per MB of input, minus the counts of `null_func` (also
+        per MB), so only the work done by the parser is counted.
+        """
+
+        def count(func):
+            self.prepare()
+            counters.start()
+            for _ in range(n):
+                self.run_once(func)
+            counts = counters.stop()
+            mb = self.size * n * getattr(func, "requests", 1) / 1024 / 1024
+            return {name: value / mb for name, value in counts.items()}
+
+        self.run_once(func)
+        counts = count(func)
+        if null_func:
+            overhead = count(null_func)
+            counts = {name: counts[name] - overhead[name] for name in counts}
+        return counts
+
+    def _spooled_bytes(self):
+        """Bytes written by this process so far, minus writes of body sources."""
+        written = written_bytes()
+        if written is None or not self.source:
+            return written
+        from . import sources
+
+        return written - sources.written
+
+    def run_memory(self, func):
+        """Measure memory usage and disk spooling of a single run.
+
+        Returns a dict with the peak RSS increase, the tracemalloc peak, the
+        number of memory blocks still allocated after the run (leaks or cyclic
+        garbage, not all allocations made during the run) and the number of
+        bytes written to (temporary) files. Values are None if not supported
+        on this platform.
+        """
+        # Warm up, so that lazy imports or caches are not counted
+        self.run_once(func)
+        gc.collect()
+
+        reset_peak_rss()
+        rss = current_rss()
+        written = self._spooled_bytes()
+        blocks = sys.getallocatedblocks()
+        gc.disable()
+        try:
+            self.run_once(func)
+            blocks = sys.getallocatedblocks() - blocks
+        finally:
+            gc.enable()
+        peak = peak_rss()
+        spooled = self._spooled_bytes()
+
+        tracemalloc.start()
+        try:
+            self.run_once(func)
+            traced_peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "peak_rss": None if rss is None else max(0, peak - rss),
+            "tracemalloc_peak": traced_peak,
+            "blocks": blocks,
+            "spooled": None if written is None else spooled - written,
+        }
+
+
+class StreamingScenario(Scenario):
+    """Scenario with a payload that is generated on the fly while reading.
+
+    Body patterns are never materialized, so harness memory stays constant
+    even for multi-gigabyte payloads. Payloads are not cached on disk.
+    """
+
+    def prepare(self):
+        if self._payload is None:
+            self._build(PatternStream())
+            self._seek = self._payload.seek
+        if self.source and "_source_path" not in self.__dict__:
+            self._prepare_source()
+        return self
+
+    def pattern(self, pattern, size):
+        if isinstance(pattern, str):
+            pattern = pattern.encode("utf8")
+        if self._in_body:
+            self.fields[-1][3] += size
+        self._payload.repeat(pattern, size)
+        return self
+
 
-class Result(namedtuple("Result", "name size times")):
+class Result(
+    namedtuple(
+        "Result",
+        "name size times memory feed_latencies iterations overhead counters",
+        defaults=(None, None, None, None, None),
+    )
+):
     DEFAULT_CONFIDENCE_LEVEL = 0.95
     TRIM_FRACTION = 0.10
 
@@ -199,6 +850,55 @@ class Result(namedtuple("Result", "name size times")):
             max(throughput - low_throughput, high_throughput - throughput) / throughput
         )
 
+    @property
+    def ipc(self):
+        """Instructions per cycle, from hardware counters (if collected)."""
+        counters = self.counters or {}
+        if not counters.get("cycles") or "instructions" not in counters:
+            return None
+        return counters["instructions"] / counters["cycles"]
+
+    @property
+    def overhead_share(self):
+        """Share of the harness overhead in the total (paired mode only).
+
+        A value of 0.9 means that 90% of the measured time was spent outside of
+        the parser (reading the payload, calling the parser function).
+        """
+        if not self.overhead:
+            return None
+        overhead = stats.tmean(self.overhead)
+        return overhead / (overhead + self.avg)
+
+    @property
+    def blocks_per_mb(self):
+        """Memory blocks left allocated by a single run, per MB of input."""
+        if not self.memory or self.memory.get("blocks") is None:
+            return None
+        return self.memory["blocks"] / (self.size / 1024 / 1024)
+
+    @property
+    def requests_per_second(self):
+        return 1 / self.avg
+
+    def request_latency(self, percentile):
+        """Per-request latency (in seconds) based on per-iteration samples."""
+        if not self.iterations:
+            return None
+        return float(np.percentile(self.iterations, percentile))
+
+    def speed(self, unit="MB/s"):
+        """Throughput in MB/s or requests per second, depending on `unit`."""
+        if unit == "req/s":
+            return self.requests_per_second
+        return self.throughput / 1024 / 1024
+
+    def feed_latency(self, percentile):
+        """Per-call latency (in seconds) of the non-blocking parser API."""
+        if not self.feed_latencies:
+            return None
+        return float(np.percentile(self.feed_latencies, percentile))
+
     @property
     def count(self):
         return len(self.times)
@@ -221,31 +921,84 @@ class Result(namedtuple("Result", "name size times")):
 ### Scenarios
 ##
 
+#: Characters allowed in boundaries (RFC 2046 bcharsnospace)
+BCHARS = string.ascii_letters + string.digits + "'()+_,-./:=?"
+
+
+def random_form(
+    payload,
+    seed,
+    parts=(1, 20),
+    files=0.25,
+    field_size=(32, 1.5),
+    file_size=(2**16, 2.0),
+    headers=(0, 2),
+    boundary=(16, 70),
+    max_size=2**24,
+):
+    """Build a random but reproducible form.
+
+    Counts and lengths are drawn uniformly from (min, max) ranges. Field and
+    file sizes are drawn from log-normal distributions given as (median,
+    sigma) and capped at `max_size`. `files` is the probability of each part
+    being a file upload. Changes to this function must bump GENERATOR_VERSION.
+    """
+    rng = random.Random(seed)
+    length = rng.randint(*boundary)
+    payload.boundary = "".join(rng.choices(BCHARS, k=length)).encode("ASCII")
+
+    def draw_size(median, sigma):
+        return min(max_size, int(rng.lognormvariate(math.log(median), sigma)))
+
+    for i in range(rng.randint(*parts)):
+        extra = [
+            (f"X-Header-{n}", "".join(rng.choices(BCHARS, k=rng.randint(1, 64))))
+            for n in range(rng.randint(*headers))
+        ]
+        if rng.random() < files:
+            extra.insert(0, ("Content-Type", "application/octet-stream"))
+            payload.field(f"file{i}", f"file{i}.bin", extra)
+            payload.pattern(string.printable, draw_size(*file_size))
+        else:
+            payload.field(f"field{i}", headers=extra)
+            payload.pattern(string.printable, draw_size(*field_size))
+
+
 SCENARIOS: list[Scenario] = []
 
 
-def add_scenario(func):
-    scenario = Scenario(func.__name__, func.__doc__.strip())
-    func(scenario)
-    scenario.end()
+def get_scenario(name, overrides=None):
+    for scenario in SCENARIOS:
+        if scenario.name == name:
+            if overrides:
+                # Variants share the payload of the registered scenario
+                return scenario.prepare().variant(**overrides)
+            return scenario
+    raise KeyError(name)
+
+
+def add_scenario(func=None, *, cls=Scenario, **options):
+    if func is None:
+        return lambda func: add_scenario(func, cls=cls, **options)
+    scenario = cls(func.__name__, func.__doc__.strip(), func, **options)
     SCENARIOS.append(scenario)
     return scenario
 
 
-@add_scenario
+@add_scenario(unit="req/s")
 def empty(payload):
     "An empty form to measure parser initialization overhead"
     pass
 
 
-@add_scenario
+@add_scenario(unit="req/s")
 def simple(payload):
     "A simple form with just two small text fields"
     payload.field("email").pattern(string.printable, 24)
     payload.field("password").pattern(string.printable, 16)
 
 
-@add_scenario
+@add_scenario(unit="req/s")
 def large(payload):
     "A large form with 100 small text fields"
     for i in range(100):
@@ -253,44 +1006,76 @@ def large(payload):
 
 
 @add_scenario
-def upload(payload):
+def upload(payload, size=1024 * 1024 * 32):
     "A file upload with a single large (32MB) file"
-    payload.field("foo", "bar.bin").pattern(string.printable, 1024 * 1024 * 32)
+    headers = [("Content-Type", "image/jpeg")]
+    payload.field("foo", "bar.jpg", headers).content("binary", size)
 
 
 @add_scenario
 def mixed(payload):
     "A form with two text fields and two small file uploads (1MB and 2MB)"
-    payload.field("field").pattern(string.printable, 16)
-    payload.field("file", "file.bin").pattern(string.printable, 1024 * 1024 * 1)
-    payload.field("field2").pattern(string.printable, 32)
-    payload.field("file2", "file2.bin").pattern(string.printable, 1024 * 1024 * 2)
+    csv, jpeg = [("Content-Type", "text/csv")], [("Content-Type", "image/jpeg")]
+    payload.field("field").content("text", 16, seed=1)
+    payload.field("file", "file.csv", csv).content("csv", 1024 * 1024 * 1, seed=2)
+    payload.field("field2").content("text", 32, seed=3)
+    payload.field("file2", "file2.jpg", jpeg).content("binary", 1024 * 1024 * 2, seed=4)
 
 
 @add_scenario
-def worstcase_crlf(payload):
+def worstcase_crlf(payload, size=1024 * 1024):
     "A 1MB upload that contains nothing but windows line-breaks"
-    payload.field("file", "file.bin").pattern("\r\n", 1024 * 1024)
+    payload.field("file", "file.bin").pattern("\r\n", size)
 
 
 @add_scenario
-def worstcase_lf(payload):
+def worstcase_lf(payload, size=1024 * 1024):
     "A 1MB upload that contains nothing but linux line-breaks"
-    payload.field("file", "file.bin").pattern("\n", 1024 * 1024)
+    payload.field("file", "file.bin").pattern("\n", size)
 
 
 @add_scenario
-def worstcase_bchar(payload):
+def worstcase_bchar(payload, size=1024 * 1024):
     "A 1MB upload that contains parts of the boundary"
     fake_boundary = b"\r\n--" + payload.boundary[:-1]
-    payload.field("file", "file.bin").pattern(fake_boundary, 1024 * 1024)
+    payload.field("file", "file.bin").pattern(fake_boundary, size)
 
 
 @add_scenario
-def worstcase_junk(payload: Scenario):
+def worstcase_junk(payload: Scenario, size=1024 * 1024):
     "Junk before the first and after the last boundary (1MB each)"
-    payload.pattern(string.printable, 1024 * 1024)
+    payload.pattern(string.printable, size)
     payload.field("file", "file.bin").write(b"Content\r\n")
     payload.end()
-    payload.pattern(string.printable, 1024 * 1024)
+    payload.pattern(string.printable, size)
     payload.size = payload.payload.tell()
+
+
+@add_scenario(default=False, family=20)
+def random_forms(payload, seed=0):
+    "Randomly generated forms with a mix of text fields and file uploads"
+    random_form(payload, seed)
+
+
+@add_scenario(default=False, family=20)
+def random_uploads(payload, seed=0):
+    "Randomly generated forms with few but large file uploads"
+    random_form(payload, seed, parts=(1, 4), files=0.75, file_size=(2**20, 1.5))
+
+
+@add_scenario(cls=StreamingScenario, default=False)
+def upload_1g(payload):
+    "A streamed file upload with a single huge (1GB) file"
+    payload.field("foo", "bar.bin").pattern(string.printable, 1024**3)
+
+
+@add_scenario(cls=StreamingScenario, default=False)
+def upload_4g(payload):
+    "A streamed file upload with a single huge (4GB) file"
+    payload.field("foo", "bar.bin").pattern(string.printable, 1024**3 * 4)
+
+
+@add_scenario(cls=StreamingScenario, default=False)
+def upload_16g(payload):
+    "A streamed file upload with a single huge (16GB) file"
+    payload.field("foo", "bar.bin").pattern(string.printable, 1024**3 * 16)
@@ -0,0 +1,55 @@
+import math
+import time
+
+
+class BudgetScheduler:
+    """Decide which tests to measure next, within a total wall-clock budget.
+
+    Every test is measured `min_rounds` times first. After that, the next
+    measurement goes to the test where it is expected to shrink the relative
+    confidence interval the most per second spent, which favors wide intervals
+    and cheap tests. Tests that reached `precision` are not measured again.
+    """
+
+    def __init__(self, names, budget, min_rounds, precision, confidence_level):
+        self.names = list(names)
+        self.deadline = time.monotonic() + budget
+        self.min_rounds = min_rounds
+        self.precision = precision
+        self.confidence_level = confidence_level
+        self.costs = {}  # name -> wall time of the last measurement
+
+    def spent(self, name, seconds):
+        self.costs[name] = seconds
+
+    def converged(self, result):
+        return (
+            result.count >= self.min_rounds
+            and result.relative_confidence_interval(self.confidence_level)
+            <= self.precision
+        )
+
+    def unconverged(self, results):
+        return [name for name in self.names if not self.converged(results[name])]
+
+    def priority(self, result, cost):
+        count = result.count
+        if count < self.min_rounds:
+            return (1, -count)
+        width = result.relative_confidence_interval(self.confidence_level)
+        if math.isinf(width):
+            return (1, -count)
+        # The interval shrinks roughly with the square root of the sample count
+        gain = width * (1 - math.sqrt(count / (count + 1))) / self.precision
+        return (0, gain / max(cost, 1e-3))
+
+    def next(self, results, count=1):
+        """Names of up to `count` tests to measure next (empty when done)."""
+        if time.monotonic() >= self.deadline:
+            return []
+        candidates = self.unconverged(results)
+        candidates.sort(
+            key=lambda name: self.priority(results[name], self.costs.get(name, 1.0)),
+            reverse=True,
+        )
+        return candidates[:count]
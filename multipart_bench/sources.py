@@ -0,0 +1,168 @@
+import atexit
+import contextlib
+import os
+import socket
+import tempfile
+import threading
+
+from .scenarios import MappedPayload, PatternStream, ViewReader
+
+#: Context managers that take a scenario and a parser function and yield a
+#: reader for the payload (see `Scenario.source`)
+SOURCES = {}
+
+#: Size of the writes that feed sockets and pipes
+FEED_SIZE = 2**16
+
+
+def add_source(name):
+    def decorator(func):
+        SOURCES[name] = contextlib.contextmanager(func)
+        return func
+
+    return decorator
+
+
+#: Bytes that writer threads passed to write() so far. These show up in
+#: `system.written_bytes()` and are not spooled by the parser.
+written = 0
+
+
+def _write_all(fd, data):
+    global written
+    view = memoryview(data)
+    while view:
+        size = os.write(fd, view)
+        written += size
+        view = view[size:]
+
+
+def _shared_reader(scenario, views=True):
+    """Reader for the already loaded payload, without a copy."""
+    payload = scenario.prepare()._payload
+    if isinstance(payload, PatternStream):
+        return payload.clone()
+    # Shares the buffer, does not copy
+    return ViewReader(payload.getvalue(), views=views)
+
+
+def _feed(write, scenario, done):
+    """Write the payload in chunks. Runs in a writer thread."""
+    reader = _shared_reader(scenario)
+    try:
+        while chunk := reader.read(FEED_SIZE):
+            write(chunk)
+    except OSError:
+        pass  # Parser stopped reading and closed its end
+    finally:
+        done()
+
+
+def _start_feed(write, scenario, done):
+    thread = threading.Thread(target=_feed, args=(write, scenario, done), daemon=True)
+    thread.start()
+    return thread
+
+
+#: Sources that read from a regular file (see `source_file`)
+FILE_SOURCES = {"file", "mmap"}
+#: Files created by `source_file` in this process that still exist
+_files = set()
+
+
+def source_file(scenario):
+    """Payload as a regular file in the temp directory (see `TMPDIR`).
+
+    Set `TMPDIR` to a tmpfs mount to avoid disk I/O. Files are named after
+    the cache key of the payload, so variants and worker processes share
+    them. They are removed by `remove_source_files()`, or when the process
+    that created them exits.
+    """
+    path = scenario.__dict__.get("_source_path")
+    if path is None:
+        key = scenario.cache_key() or f"{scenario.name}-{os.getpid()}"
+        path = os.path.join(tempfile.gettempdir(), f"multipart-bench-{key}.bin")
+        if not os.path.exists(path):
+            reader = scenario.open()
+            with tempfile.NamedTemporaryFile(
+                prefix="multipart-bench-", dir=os.path.dirname(path), delete=False
+            ) as fp:
+                while chunk := reader.read(FEED_SIZE):
+                    fp.write(chunk)
+            os.replace(fp.name, path)
+            _files.add(path)
+        scenario._source_path = path
+    return path
+
+
+def prepare_source(scenario):
+    """Create everything a source needs up front, so runs do not pay for it."""
+    if scenario.source in FILE_SOURCES:
+        source_file(scenario)
+    else:
+        scenario._source_path = None
+
+
+@atexit.register
+def remove_source_files():
+    """Remove all files created by `source_file` in this process."""
+    for path in _files:
+        with contextlib.suppress(OSError):
+            os.unlink(path)
+    _files.clear()
+
+
+@add_source("socket")
+def open_socket(scenario, func):
+    """Unix socket fed by a writer thread. Reads may return less than requested."""
+    reader, writer = socket.socketpair()
+    done = lambda: writer.shutdown(socket.SHUT_WR)
+    thread = _start_feed(writer.sendall, scenario, done)
+    rfile = reader.makefile("rb", buffering=0)
+    try:
+        yield rfile
+    finally:
+        rfile.close()
+        reader.close()
+        thread.join()
+        writer.close()
+
+
+@add_source("pipe")
+def open_pipe(scenario, func):
+    """Pipe fed by a writer thread. Reads may return less than requested."""
+    rfd, wfd = os.pipe()
+    write = lambda data: _write_all(wfd, data)
+    thread = _start_feed(write, scenario, lambda: os.close(wfd))
+    rfile = open(rfd, "rb", buffering=0)
+    try:
+        yield rfile
+    finally:
+        rfile.close()
+        thread.join()
+
+
+@add_source("file")
+def open_file(scenario, func):
+    """Unbuffered regular file, read with one syscall per read()."""
+    with open(source_file(scenario), "rb", buffering=0) as rfile:
+        yield rfile
+
+
+@add_source("mmap")
+def open_mmap(scenario, func):
+    """Memory-mapped view of a regular file."""
+    payload = MappedPayload.from_file(source_file(scenario))
+    try:
+        yield payload
+    finally:
+        payload.close()
+
+
+@add_source("view")
+def open_view(scenario, func):
+    """Zero-copy `memoryview` slices of the payload, or bytes for parsers that
+    do not accept buffers (see `ViewReader`)."""
+    if isinstance(scenario.prepare()._payload, PatternStream):
+        raise TypeError("Streaming payloads cannot be read as a buffer")
+    yield _shared_reader(scenario, views=getattr(func, "buffers", False))
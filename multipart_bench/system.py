@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import platform
+import sys
+from importlib import metadata
+
+SYSFS_CPU = "/sys/devices/system/cpu"
+
+
+def _read_sysfs(path, default=None):
+    try:
+        with open(path, "r") as fp:
+            return fp.read().strip()
+    except OSError:
+        return default
+
+
+def parse_cpu_list(text):
+    """Parse a sysfs cpu list (e.g. "0-3,8,10-11") into a set of cpu ids."""
+    cpus = set()
+    for part in (text or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-")
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus
+
+
+def available_cpus():
+    """CPUs this process is allowed to run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def thread_siblings(cpu):
+    """Hardware threads sharing a physical core with `cpu` (including itself)."""
+    text = _read_sysfs(f"{SYSFS_CPU}/cpu{cpu}/topology/thread_siblings_list")
+    return parse_cpu_list(text) or {cpu}
+
+
+def shared_caches(cpu):
+    """Data or unified caches of `cpu` as a list of (level, shared_cpus) tuples."""
+    caches = []
+    index = 0
+    while True:
+        base = f"{SYSFS_CPU}/cpu{cpu}/cache/index{index}"
+        level = _read_sysfs(f"{base}/level")
+        if level is None:
+            break
+        if _read_sysfs(f"{base}/type") != "Instruction":
+            shared = parse_cpu_list(_read_sysfs(f"{base}/shared_cpu_list"))
+            caches.append((int(level), shared or {cpu}))
+        index += 1
+    return caches
+
+
+def select_cores(jobs):
+    """Pick `jobs` CPUs to pin benchmark workers to (0 means one per core).
+
+    Physical cores are preferred over sibling hyperthreads. Returns the list of
+    selected CPUs and a list of warnings about shared resources that may make
+    results less reliable or less comparable to a single-core run.
+    """
+    allowed = available_cpus()
+    warnings = []
+
+    primary, secondary = [], []
+    seen = set()
+    for cpu in allowed:
+        if cpu in seen:
+            secondary.append(cpu)
+            continue
+        primary.append(cpu)
+        seen.update(thread_siblings(cpu))
+
+    if jobs <= 0:
+        jobs = len(primary)
+    if jobs > len(allowed):
+        warnings.append(
+            f"Requested {jobs} jobs but only {len(allowed)} CPUs are available,"
+            f" running {len(allowed)} jobs instead."
+        )
+        jobs = len(allowed)
+
+    cores = (primary + secondary)[:jobs]
+
+    busy = set(cores)
+    ht_shared = sorted(cpu for cpu in cores if len(thread_siblings(cpu) & busy) > 1)
+    if ht_shared:
+        warnings.append(
+            f"CPUs {ht_shared} are sibling hyperthreads of other workers."
+            " Parallel results will be slower and noisier than serial runs."
+        )
+
+    groups = {}  # level -> set of frozensets of busy cpus sharing a cache
+    for cpu in cores:
+        for level, shared in shared_caches(cpu):
+            if len(shared & busy) > 1:
+                groups.setdefault(level, set()).add(frozenset(shared & busy))
+    for level, shared in sorted(groups.items()):
+        shared = ", ".join(str(sorted(group)) for group in sorted(shared, key=min))
+        warnings.append(
+            f"Workers share L{level} caches (CPUs {shared})."
+            " Memory-bound tests may interfere with each other."
+        )
+
+    return cores, warnings
+
+
+def pin_to_cpu(cpu):
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpu})
+
+
+def _proc_status(key):
+    """Read a value (in bytes) from /proc/self/status, or None if unavailable."""
+    try:
+        with open("/proc/self/status", "r") as fp:
+            for line in fp:
+                if line.startswith(key + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def current_rss():
+    return _proc_status("VmRSS")
+
+
+def peak_rss():
+    peak = _proc_status("VmHWM")
+    if peak is None:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return peak
+
+
+def reset_peak_rss():
+    """Reset the peak RSS of this process to its current RSS (Linux only).
+
+    Returns False if not supported, in which case `peak_rss()` reports the
+    peak of the entire process lifetime.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as fp:
+            fp.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def written_bytes():
+    """Number of bytes this process passed to write() syscalls so far."""
+    try:
+        with open("/proc/self/io", "r") as fp:
+            for line in fp:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def package_version(name):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "not installed"
+
+
+def python_version():
+    return platform.python_version()
+
+
+def cpu_model():
+    try:
+        with open("/proc/cpuinfo", "r") as fp:
+            for line in fp:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def interpreter_info():
+    """Python implementation, version and build details."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return {
+        "implementation": platform.python_implementation(),
+        "version": python_version(),
+        "build": sys.version,
+        "gil": is_gil_enabled() if is_gil_enabled else True,
+    }
+
+
+def host_info():
+    """Hardware and OS details that affect benchmark results."""
+    return {
+        "hostname": platform.node(),
+        "system": platform.system(),
+        "release": platform.release(),
+        "machine": platform.machine(),
+        "cpu": cpu_model(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def host_fingerprint(info=None):
+    """Short id for the benchmark host. Changes if the hardware changes."""
+    info = info or host_info()
+    stable = {key: info[key] for key in ("hostname", "machine", "cpu", "cpus")}
+    return hashlib.sha256(json.dumps(stable, sort_keys=True).encode()).hexdigest()[:12]
@@ -0,0 +1,51 @@
+import concurrent.futures
+import sys
+
+from .scenarios import Scenario
+
+
+def gil_enabled():
+    """False on free-threaded builds (3.13t+) that run with the GIL disabled."""
+    is_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_enabled() if is_enabled else True
+
+
+class ThreadBench:
+    """Parse the same scenario in `threads` threads at once.
+
+    Instances can be used like parser functions (they take a scenario) and
+    process one request per thread and call, each with its own payload reader.
+    Threads are started once and reused, like in a WSGI server thread pool.
+    """
+
+    def __init__(self, func, threads=1):
+        self.func = func
+        self.threads = self.requests = threads
+        self.in_memory = getattr(func, "in_memory", False)
+        self.__name__ = f"{func.__name__}@threads={threads}"
+        self._pool = None
+
+    def __getstate__(self):
+        return {**self.__dict__, "_pool": None}
+
+    def __call__(self, scenario: Scenario):
+        if self._pool is None:
+            self._pool = concurrent.futures.ThreadPoolExecutor(self.threads)
+        views = [scenario.clone() for _ in range(self.threads)]
+        for _ in self._pool.map(self.func, views):
+            pass
+
+    def close(self):
+        """Stop the worker threads. The next call starts new ones."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def scaling_efficiency(single, multi, threads):
+    """Aggregate throughput with `threads` threads relative to perfect scaling.
+
+    1.0 means linear scaling, 1/threads means the parser fully serializes
+    (e.g. on the GIL or on shared module-level state).
+    """
+    return multi.throughput / (threads * single.throughput)
@@ -5,3 +5,4 @@ python3 -mvenv .venv
 pip install -U pip
 pip install -Ur requirements-run.txt
 pip install -Ur requirements-parsers.txt
+pip install -Ur requirements-frameworks.txt
@@ -0,0 +1,65 @@
+import argparse
+from fnmatch import fnmatch
+import time
+
+ap = argparse.ArgumentParser(
+    description="Show how benchmark results changed across parser releases."
+)
+ap.add_argument(
+    "--history",
+    default="var/history.sqlite3",
+    metavar="FILE",
+    help="SQLite database written by run.py (default: var/history.sqlite3)",
+)
+ap.add_argument(
+    "-n",
+    "--releases",
+    default=None,
+    type=int,
+    help="Only show the most recent N parser versions.",
+)
+ap.add_argument(
+    "--host",
+    default=None,
+    help="Only show results from this host fingerprint ('this' for the current host).",
+)
+ap.add_argument(
+    "--python",
+    default=None,
+    help="Only show results measured with this Python version (e.g. 3.13.1).",
+)
+ap.add_argument(
+    "benchmarks", nargs="+", help="Glob patterns for benchmark names to show"
+)
+
+
+if __name__ == "__main__":
+    args = ap.parse_args()
+
+    from multipart_bench.formatting import format_speed
+    from multipart_bench.history import History
+    from multipart_bench.scenarios import get_scenario
+    from multipart_bench.system import host_fingerprint
+
+    host = host_fingerprint() if args.host == "this" else args.host
+    history = History(args.history)
+    for name in sorted(history.names()):
+        if not any(fnmatch(name, glob) for glob in args.benchmarks):
+            continue
+        rows = history.query(name, host=host, python=args.python, releases=args.releases)
+        if not rows:
+            continue
+        print(name)
+        for row, result in rows:
+            try:
+                unit = get_scenario(row["scenario"]).unit
+            except KeyError:
+                unit = "MB/s"  # Scenario was removed or renamed since
+            speed = format_speed(result.speed(unit), unit)
+            started = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["started"]))
+            print(
+                f"  {row['version'] or '-':>16} {speed:>14}"
+                f" (±{result.relative_confidence_interval():.2%}, n={result.count})"
+                f"  {started} python {row['python']} host {row['host']}"
+            )
+    history.close()
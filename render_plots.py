@@ -1,5 +1,6 @@
-from multipart_bench.scenarios import SCENARIOS, Result
+from multipart_bench.scenarios import SCENARIOS, Result, format_size, parse_size
 from multipart_bench.parsers import parser_table
+import glob
 import os.path
 import matplotlib.pyplot as plt
 import numpy as np
@@ -9,6 +10,19 @@ def load_results(scenario, test):
     if os.path.exists(fname):
         return Result.load(fname)
 
+def chunk_results(scenario, test):
+    """Results of a test per chunk size, including the default chunk size."""
+    prefix = f"var/{scenario.name_for(test)}@chunk="
+    points = {
+        parse_size(fname[len(prefix) : -len(".json")]): Result.load(fname)
+        for fname in glob.glob(glob.escape(prefix) + "*.json")
+    }
+    if points:
+        result = load_results(scenario, test)
+        if result:
+            points[scenario.chunksize] = result
+    return sorted(points.items())
+
 def parser_status(scenario, test):
     if not test:
         return None, "no result"
@@ -20,30 +34,42 @@ def parser_status(scenario, test):
     return result, None
 
 
-def throughput(result):
+def throughput(result, unit="MB/s"):
     if not result:
         return 0
-    return result.throughput / 1024 / 1024
+    return result.speed(unit)
+
+
+def format_value(value, unit):
+    if unit == "req/s":
+        return f"{value:.0f} req/s"
+    return f"{value:.2f} MB/s"
+
 
+def axis_label(unit):
+    if unit == "req/s":
+        return "Requests per second"
+    return "Throughput in MB/s"
 
-def plot_one(entries, title, plot_max, output_file):
+
+def plot_one(entries, title, plot_max, output_file, unit="MB/s"):
     fig, ax = plt.subplots(figsize=(6.4, 2.4))
     ax.set_title(title)
 
     ordered = entries[::-1]
     xpos = np.arange(len(ordered))
-    values = [throughput(result) for _, result, _ in ordered]
+    values = [throughput(result, unit) for _, result, _ in ordered]
     rects = ax.barh(xpos, values, .8, tick_label=[name for name, _, _ in ordered])
 
     for rect, (_, result, status), value in zip(rects, ordered, values):
         y = rect.get_y() + rect.get_height() / 2
         if result:
-            ax.text(value + plot_max * 0.01, y, f"{value:.2f} MB/s", va="center", ha="left")
+            ax.text(value + plot_max * 0.01, y, format_value(value, unit), va="center", ha="left")
         else:
             color = "red" if status == "failed" else "dimgray"
             ax.text(plot_max * 0.02, y, status, va="center", ha="left", color=color)
 
-    ax.set_xlabel('Throughput in MB/s (higher is better)')
+    ax.set_xlabel(f'{axis_label(unit)} (higher is better)')
     ax.set_xlim(0, plot_max)
     ax.set_ylim(-0.5, len(ordered) - 0.5)
 
@@ -51,13 +77,13 @@ def plot_one(entries, title, plot_max, output_file):
     plt.savefig(output_file)
     plt.close(fig)
 
-def plot_one_horizontal(entries, title, plot_max, output_file):
+def plot_one_horizontal(entries, title, plot_max, output_file, unit="MB/s"):
     fig, ax = plt.subplots(figsize=(9, 2.4))
     ax.set_title(title)
 
     ordered = entries
     xpos = np.arange(len(ordered))
-    values = [throughput(result) for _, result, _ in ordered]
+    values = [throughput(result, unit) for _, result, _ in ordered]
     rects = ax.bar(
         xpos,
         values,
@@ -68,12 +94,12 @@ def plot_one_horizontal(entries, title, plot_max, output_file):
     for rect, (_, result, status), value in zip(rects, ordered, values):
         x = rect.get_x() + rect.get_width() / 2
         if result:
-            ax.text(x, value + plot_max * 0.01, f"{value:.2f} MB/s", va="bottom", ha="center")
+            ax.text(x, value + plot_max * 0.01, format_value(value, unit), va="bottom", ha="center")
         else:
             color = "red" if status == "failed" else "dimgray"
             ax.text(x, plot_max * 0.02, status, va="bottom", ha="center", color=color)
 
-    ax.set_ylabel('Throughput in MB/s')
+    ax.set_ylabel(axis_label(unit))
     ax.set_xlim(-0.5, len(ordered) - 0.5)
     ax.set_ylim(0, plot_max)
 
@@ -82,8 +108,9 @@ def plot_one_horizontal(entries, title, plot_max, output_file):
     plt.close(fig)
 
 def plot(scenario, blocking, non_blocking):
-    max_b = max([throughput(result) for _, result, _ in blocking] or [0])
-    max_nb = max([throughput(result) for _, result, _ in non_blocking] or [0])
+    unit = scenario.unit
+    max_b = max([throughput(result, unit) for _, result, _ in blocking] or [0])
+    max_nb = max([throughput(result, unit) for _, result, _ in non_blocking] or [0])
     max_all = max((max_b, max_nb))
 
     plot_one_horizontal(
@@ -91,16 +118,76 @@ def plot(scenario, blocking, non_blocking):
         f"Scenario {scenario.name!r} (non-blocking)",
         (max_nb or 1.0) * 1.2,
         f"plots/{scenario.name}-non-blocking.svg",
+        unit,
     )
     plot_one_horizontal(
         blocking,
         f"Scenario {scenario.name!r} (blocking)",
         (max_b or 1.0) * 1.2,
         f"plots/{scenario.name}-blocking.svg",
+        unit,
     )
 
+def plot_memory(scenario, entries, output_file):
+    """Peak RSS increase and tracemalloc peak per parser variant."""
+    mb = 1024 * 1024
+    labels = [name for name, _ in entries]
+    rss = [(result.memory.get("peak_rss") or 0) / mb for _, result in entries]
+    traced = [(result.memory.get("tracemalloc_peak") or 0) / mb for _, result in entries]
+
+    fig, ax = plt.subplots(figsize=(6.4, 0.3 * len(entries) + 1))
+    ax.set_title(f"Scenario {scenario.name!r} (memory)")
+    ypos = np.arange(len(entries))[::-1]
+    ax.barh(ypos + 0.2, rss, 0.4, label="Peak RSS increase")
+    ax.barh(ypos - 0.2, traced, 0.4, label="tracemalloc peak")
+    ax.set_yticks(ypos, labels)
+    ax.set_xlabel("Memory in MB (lower is better)")
+    ax.legend(loc="lower right")
+
+    plt.tight_layout()
+    plt.savefig(output_file)
+    plt.close(fig)
+
+def plot_chunks(scenario, entries, output_file):
+    """Throughput over chunk size, one curve per parser variant."""
+    unit = scenario.unit
+    fig, ax = plt.subplots(figsize=(9, 4.8))
+    ax.set_title(f"Scenario {scenario.name!r} (chunk size)")
+
+    sizes = set()
+    for name, points in entries:
+        sizes.update(size for size, _ in points)
+        ax.plot(
+            [size for size, _ in points],
+            [throughput(result, unit) for _, result in points],
+            marker="o",
+            linestyle="--" if name.endswith("(blocking)") else "-",
+            label=name,
+        )
+
+    ax.set_xscale("log", base=2)
+    ax.set_xticks(sorted(sizes), [format_size(size) for size in sorted(sizes)])
+    ax.set_xlabel("Chunk size in bytes")
+    ax.set_ylabel(f"{axis_label(unit)} (higher is better)")
+    ax.set_ylim(bottom=0)
+    ax.legend(loc="upper left", fontsize="small", bbox_to_anchor=(1, 1))
+
+    plt.tight_layout()
+    plt.savefig(output_file)
+    plt.close(fig)
+
+
 if __name__ == "__main__":
     for scenario in SCENARIOS:
+        # Opt-in scenarios are only plotted if they were actually run
+        if not scenario.default and not any(
+            load_results(scenario, test)
+            for variants in parser_table.values()
+            for test in variants
+            if test
+        ):
+            continue
+
         print(scenario.name)
 
         set1 = []
@@ -114,3 +201,21 @@ if __name__ == "__main__":
             set2.append((name, result, status))
         
         plot(scenario, set1, set2)
+
+        memory = []
+        for name, variants in parser_table.items():
+            for label, variant in zip(("blocking", "non-blocking"), variants):
+                result = load_results(scenario, variant) if variant else None
+                if result and result.memory:
+                    memory.append((f"{name} ({label})", result))
+        if memory:
+            plot_memory(scenario, memory, f"plots/{scenario.name}-memory.svg")
+
+        chunks = []
+        for name, variants in parser_table.items():
+            for label, variant in zip(("blocking", "non-blocking"), variants):
+                points = chunk_results(scenario, variant) if variant else []
+                if len(points) > 1:
+                    chunks.append((f"{name} ({label})", points))
+        if chunks:
+            plot_chunks(scenario, chunks, f"plots/{scenario.name}-chunks.svg")
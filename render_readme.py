@@ -1,22 +1,13 @@
+import glob
 import os.path
-import platform
-from importlib import metadata
 
 from jinja2 import Environment, FileSystemLoader, StrictUndefined
 
+from multipart_bench.analysis import fit_complexity
+from multipart_bench.formatting import format_duration, format_speed
 from multipart_bench.parsers import parser_table
 from multipart_bench.scenarios import SCENARIOS, Result
-
-
-def package_version(name):
-    try:
-        return metadata.version(name)
-    except metadata.PackageNotFoundError:
-        return "not installed"
-
-
-def python_version():
-    return platform.python_version()
+from multipart_bench.system import package_version, python_version
 
 
 def load_result(scenario, parser):
@@ -25,16 +16,100 @@ def load_result(scenario, parser):
         return Result.load(path)
 
 
-def format_result(result, baseline, available=True):
+def format_result(result, baseline, available=True, unit="MB/s"):
     if not available:
         return "-"
     if not result:
         return "*failed*"
 
     throughput = result.throughput
-    mbps = throughput / 1024 / 1024
     percent = 100 * throughput / baseline if baseline else 0
-    return f"{mbps:.2f} MB/s ({percent:.0f}%)"
+    return f"{format_speed(result.speed(unit), unit, ' ')} ({percent:.0f}%)"
+
+
+def request_latency_rows(scenario):
+    rows = []
+    for name, variants in parser_table.items():
+        for label, variant in zip(("blocking", "non-blocking"), variants):
+            result = load_result(scenario, variant) if variant else None
+            if not (result and result.iterations):
+                continue
+            rows.append(
+                {
+                    "name": f"{name} ({label})",
+                    "p50": format_duration(result.request_latency(50), " "),
+                    "p90": format_duration(result.request_latency(90), " "),
+                    "p99": format_duration(result.request_latency(99), " "),
+                }
+            )
+    return rows
+
+
+def format_bytes(value):
+    if value is None:
+        return "-"
+    return f"{value / 1024 / 1024:.2f} MB"
+
+
+def memory_rows(scenario):
+    rows = []
+    for name, variants in parser_table.items():
+        for label, variant in zip(("blocking", "non-blocking"), variants):
+            result = load_result(scenario, variant) if variant else None
+            if not (result and result.memory):
+                continue
+            memory = result.memory
+            rows.append(
+                {
+                    "name": f"{name} ({label})",
+                    "peak_rss": format_bytes(memory.get("peak_rss")),
+                    "tracemalloc_peak": format_bytes(memory.get("tracemalloc_peak")),
+                    "blocks_per_mb": f"{result.blocks_per_mb:.1f}",
+                    "spooled": format_bytes(memory.get("spooled")),
+                }
+            )
+    return rows
+
+
+def latency_rows(scenario):
+    rows = []
+    for name, (_, sansio_variant) in parser_table.items():
+        result = load_result(scenario, sansio_variant) if sansio_variant else None
+        if not (result and result.feed_latencies):
+            continue
+        rows.append(
+            {
+                "name": name,
+                "p50": format_duration(result.feed_latency(50), " "),
+                "p99": format_duration(result.feed_latency(99), " "),
+                "p999": format_duration(result.feed_latency(99.9), " "),
+                "max": format_duration(max(result.feed_latencies), " "),
+            }
+        )
+    return rows
+
+
+def complexity_rows(scenario):
+    rows = []
+    for name, variants in parser_table.items():
+        for label, variant in zip(("blocking", "non-blocking"), variants):
+            if not variant:
+                continue
+            prefix = glob.escape(f"var/{scenario.name_for(variant)}@size=")
+            results = [Result.load(path) for path in glob.glob(prefix + "*.json")]
+            results.append(load_result(scenario, variant))
+            complexity = fit_complexity(filter(None, results))
+            if complexity is None:
+                continue
+            rows.append(
+                {
+                    "name": f"{name} ({label})",
+                    "exponent": f"{complexity.exponent:.2f}",
+                    "interval": f"{complexity.low:.2f} - {complexity.high:.2f}",
+                    "verdict": "**super-linear**" if complexity.superlinear else "linear",
+                }
+            )
+    return rows
 
 
 def scenario_table(scenario):
@@ -69,18 +144,30 @@ def scenario_table(scenario):
 
     return {
         "name": scenario.name,
+        "unit": scenario.unit,
         "rows": [
             {
                 "name": row["name"],
                 "blocking": format_result(
-                    row["blocking"], baseline_blocking, row["blocking_available"]
+                    row["blocking"],
+                    baseline_blocking,
+                    row["blocking_available"],
+                    scenario.unit,
                 ),
                 "sansio": format_result(
-                    row["sansio"], baseline_sansio, row["sansio_available"]
+                    row["sansio"],
+                    baseline_sansio,
+                    row["sansio_available"],
+                    scenario.unit,
                 ),
             }
             for row in rows
         ],
+        "memory": memory_rows(scenario),
+        "chunks": bool(glob.glob(glob.escape(f"var/{scenario.name}-") + "*@chunk=*.json")),
+        "latency": latency_rows(scenario),
+        "request_latency": request_latency_rows(scenario),
+        "complexity": complexity_rows(scenario),
     }
 
 
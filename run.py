@@ -1,5 +1,6 @@
 import argparse
 from fnmatch import fnmatch
+import os
 import random
 import sys
 import cProfile
@@ -7,6 +8,8 @@ import time
 import gc
 import typing
 
+from multipart_bench.formatting import format_duration, format_result_speed
+
 PROFILES = {
     "fast": {"confidence_level": 0.80, "precision": 0.05, "rounds": 3},
     "default": {"confidence_level": 0.95, "precision": 0.02, "rounds": 5},
@@ -15,6 +18,33 @@ PROFILES = {
     "slowest": {"confidence_level": 0.99, "precision": 0.0025, "rounds": 20},
 }
 
+#: Chunk sizes for `--chunks sweep` (64 bytes to 1MB on a log scale)
+CHUNK_SWEEP = [64 * 4**i for i in range(8)]
+#: Input sizes for `--sizes sweep` (64KB to 64MB on a log scale)
+SIZE_SWEEP = [2**16 * 4**i for i in range(6)]
+
+
+def size_list(sweep):
+    def parse(value):
+        from multipart_bench.scenarios import parse_size
+
+        if value == "sweep":
+            return sweep
+        return [parse_size(size) for size in value.split(",")]
+
+    return parse
+
+
+def source_list(value):
+    from multipart_bench.sources import SOURCES
+
+    sources = list(SOURCES) if value == "all" else value.split(",")
+    for source in sources:
+        if source not in SOURCES:
+            raise argparse.ArgumentTypeError(f"unknown source: {source}")
+    return sources
+
+
 ap = argparse.ArgumentParser()
 ap.add_argument(
     "-p",
@@ -42,11 +72,137 @@ ap.add_argument(
     action="store_true",
     help="Append results to previous run instead of replacing results.",
 )
+ap.add_argument(
+    "-a",
+    "--all",
+    action="store_true",
+    help="Include opt-in scenarios (e.g. multi-gigabyte uploads) in glob matches.",
+)
 ap.add_argument(
     "--list",
     action="store_true",
     help="List all benchmark names instead of running them.",
 )
+ap.add_argument(
+    "--memory",
+    action="store_true",
+    help="Measure peak memory, allocations and disk spooling before the benchmarks.",
+)
+ap.add_argument(
+    "--profiler",
+    default="cprofile",
+    choices=["cprofile", "sample", "none"],
+    help="Profile the first run of each test with cProfile (var/<name>.prof), or"
+    " sample steady-state runs and write collapsed stacks (var/<name>.folded) and"
+    " flame graphs (var/<name>.svg).",
+)
+ap.add_argument(
+    "--flame-lines",
+    action="store_true",
+    help="Add line numbers to sampled frames. Frames of different versions of the"
+    " same code then no longer match in flamediff.py.",
+)
+ap.add_argument(
+    "--counters",
+    action="store_true",
+    help="Collect hardware performance counters (Linux only) before the benchmarks.",
+)
+ap.add_argument(
+    "--latency",
+    action="store_true",
+    help="Measure per-call latency of non-blocking parsers before the benchmarks.",
+)
+ap.add_argument(
+    "--chunks",
+    default=None,
+    type=size_list(CHUNK_SWEEP),
+    metavar="SIZE[,SIZE...]",
+    help="Also run each scenario with these chunk sizes (e.g. 64,4k,1m or 'sweep').",
+)
+ap.add_argument(
+    "--sizes",
+    default=None,
+    type=size_list(SIZE_SWEEP),
+    metavar="SIZE[,SIZE...]",
+    help="Also run size-parametric scenarios with these input sizes (e.g. 64k,1m,64m"
+    " or 'sweep') and report how runtime scales with input size.",
+)
+ap.add_argument(
+    "--seeds",
+    default=None,
+    type=int,
+    metavar="N",
+    help="Number of random scenarios per family (e.g. 'random_forms'), each with its own seed.",
+)
+ap.add_argument(
+    "--sources",
+    default=None,
+    type=source_list,
+    metavar="NAME[,NAME...]",
+    help="Also run each scenario with the body read from a real I/O source instead of"
+    " memory (socket, pipe, file, mmap, view or 'all'). The overhead baseline reads from"
+    " the same source. 'view' hands out zero-copy memoryview chunks to parsers that"
+    " accept them.",
+)
+ap.add_argument(
+    "--asyncio",
+    default=None,
+    type=lambda value: [int(n) for n in value.split(",")],
+    metavar="N[,N...]",
+    help="Also run async parsers on an event loop with N concurrent requests (e.g. 1,16).",
+)
+ap.add_argument(
+    "--threads",
+    default=None,
+    type=lambda value: [int(n) for n in value.split(",")],
+    metavar="N[,N...]",
+    help="Also run each parser in N threads at once and report scaling (e.g. 2,4,8).",
+)
+ap.add_argument(
+    "--consume",
+    action="store_true",
+    help="Also run parsers that consume the entire form: decode all fields and read"
+    " every uploaded file back from its spool (memory or temporary file).",
+)
+ap.add_argument(
+    "--frameworks",
+    action="store_true",
+    help="Also access forms through web frameworks (Flask, Django, Bottle, Starlette)"
+    " and report their overhead compared to the parser they use.",
+)
+ap.add_argument(
+    "-j",
+    "--jobs",
+    default=1,
+    type=int,
+    help="Run tests in parallel on this many CPU cores (0 = one per physical core).",
+)
+ap.add_argument(
+    "--cache",
+    default=None,
+    metavar="DIR",
+    help="Directory for cached scenario payloads (default: var/cache, empty to disable).",
+)
+ap.add_argument(
+    "--history",
+    default="var/history.sqlite3",
+    metavar="FILE",
+    help="Record all runs in this SQLite database (default: var/history.sqlite3, empty to disable).",
+)
+ap.add_argument(
+    "--paired",
+    action="store_true",
+    help="Alternate parser and overhead runs and compute results from paired"
+    " differences. More stable for very fast parsers and small forms.",
+)
+ap.add_argument(
+    "--budget",
+    default=None,
+    type=float,
+    metavar="SECONDS",
+    help="Time budget for all measurements (after calibration). Measures the tests that profit most first, stops early"
+    " once all tests are stable and reports tests that did not converge in time.",
+)
 ap.add_argument(
     "--sleep",
     default=0.1,
@@ -55,7 +211,7 @@ ap.add_argument(
 )
 
 ap.add_argument(
-    "benchmarks", nargs="*", default="*", help="Glob patterns for benchmarks to run"
+    "benchmarks", nargs="*", default=["*"], help="Glob patterns for benchmarks to run"
 )
 
 
@@ -65,8 +221,180 @@ def shuffle(values):
     return values
 
 
+def format_result(scenario, result):
+    text = format_result_speed(scenario, result)
+    if scenario.unit == "req/s" and result.iterations:
+        p50 = format_duration(result.request_latency(50))
+        p99 = format_duration(result.request_latency(99))
+        text += f" (p50 {p50}, p99 {p99})"
+    return text
+
+
+def format_memory(result):
+    memory = result.memory
+    mb = 1024 * 1024
+    parts = []
+    if memory.get("peak_rss") is not None:
+        parts.append(f"peak RSS +{memory['peak_rss'] / mb:.2f}MB")
+    parts.append(f"tracemalloc peak {memory['tracemalloc_peak'] / mb:.2f}MB")
+    parts.append(f"{result.blocks_per_mb:.1f} blocks/MB")
+    if memory.get("spooled") is not None:
+        parts.append(f"spooled {memory['spooled'] / mb:.2f}MB")
+    return ", ".join(parts)
+
+
+def format_counters(result):
+    parts = [f"{name} {value:.3g}/MB" for name, value in result.counters.items()]
+    if result.ipc is not None:
+        parts.append(f"IPC {result.ipc:.2f}")
+    return ", ".join(parts)
+
+
+def format_feed_latency(result):
+    parts = [
+        f"{label} {format_duration(result.feed_latency(percentile))}"
+        for label, percentile in (("p50", 50), ("p99", 99), ("p99.9", 99.9))
+    ]
+    parts.append(f"max {format_duration(max(result.feed_latencies))}")
+    return ", ".join(parts) + f" ({len(result.feed_latencies)} calls)"
+
+
+def print_scaling(results, threads):
+    """Print aggregate throughput and scaling efficiency per parser_table entry."""
+    from multipart_bench.scenarios import SCENARIOS
+    from multipart_bench.parsers import parser_table
+    from multipart_bench.threads import scaling_efficiency
+
+    for scenario in SCENARIOS:
+        for parsers in parser_table.values():
+            for parser in filter(None, parsers):
+                single = results.get(scenario.name_for(parser))
+                if not (single and single.times):
+                    continue
+                parts = [f"1x {format_result_speed(scenario, single)}"]
+                for n in threads:
+                    multi = results.get(f"{scenario.name_for(parser)}@threads={n}")
+                    if multi and multi.times:
+                        efficiency = scaling_efficiency(single, multi, n)
+                        speed = format_result_speed(scenario, multi)
+                        parts.append(f"{n}x {speed} ({efficiency:.0%})")
+                if len(parts) > 1:
+                    print(f"{scenario.name_for(parser)}: {', '.join(parts)}")
+
+
+def print_frameworks(alltests, results):
+    """Print framework results next to the raw parser adapter they build on."""
+    for name, scenario, func, _ in alltests:
+        parser = getattr(func, "parser", False)
+        if parser is False or not results[name].times:
+            continue
+        result = results[name]
+        text = f"{name}: {format_result_speed(scenario, result)}"
+        raw = parser and results.get(scenario.name_for(parser))
+        if raw and raw.times:
+            overhead = result.avg - raw.avg
+            text += (
+                f", {parser.__name__} {format_result_speed(scenario, raw)},"
+                f" framework overhead {overhead * 1e6:+.2f}µs/request"
+                f" ({overhead / raw.avg:+.0%})"
+            )
+        print(text)
+
+
+def variants(scenario, chunks=None, sizes=None, seeds=None, sources=None):
+    """The scenario itself and one variant per additional chunk or input size
+    and per body source.
+
+    Random scenario families are replaced by one variant per seed instead.
+    """
+    if scenario.family:
+        return [scenario.variant(seed=seed) for seed in range(seeds or scenario.family)]
+    result = [scenario]
+    result += [
+        scenario.variant(chunksize=chunksize)
+        for chunksize in chunks or []
+        if chunksize != scenario.chunksize
+    ]
+    default_size = scenario.parameters.get("size")
+    if default_size is not None:
+        result += [
+            scenario.variant(size=size) for size in sizes or [] if size != default_size
+        ]
+    result += [scenario.variant(source=source) for source in sources or []]
+    return result
+
+
+def print_families(alltests, results, baseline):
+    """Print throughput distributions of each parser across scenario families."""
+    from multipart_bench.analysis import distribution
+
+    groups = {}
+    for name, scenario, parser, _ in alltests:
+        if scenario.family and results[name].times:
+            groups.setdefault((scenario.name, parser.__name__), {})[scenario] = results[name]
+
+    for (scenario_name, parser_name), members in sorted(groups.items()):
+        speeds = [result.speed() for result in members.values()]
+        relative = []
+        for scenario, result in members.items():
+            bsresult = results.get(scenario.name_for(baseline))
+            if bsresult and bsresult.times:
+                relative.append(result.throughput / bsresult.throughput)
+        text = f"{scenario_name}-{parser_name}: {distribution(speeds, '{:.2f}MB/s')}"
+        if relative:
+            text += f", relative to {baseline.__name__}: {distribution(relative, '{:.0%}')}"
+        print(text)
+
+
+def print_complexity(alltests, results):
+    """Fit runtime against input size and flag super-linear parsers."""
+    from multipart_bench.analysis import fit_complexity
+
+    groups = {}
+    for name, scenario, parser, _ in alltests:
+        if "size" in scenario.parameters and set(scenario.overrides) <= {"size"}:
+            groups.setdefault((scenario.name, parser.__name__), []).append(results[name])
+
+    for (scenario_name, parser_name), group in sorted(groups.items()):
+        complexity = fit_complexity(group)
+        if complexity is None:
+            continue
+        warning = " <- potential DoS vector!" if complexity.superlinear else ""
+        print(f"{scenario_name}-{parser_name}: {complexity}{warning}")
+
+
+def print_overhead(alltests, results):
+    """Print how much of each measured time is harness overhead (paired mode)."""
+    shares = []
+    for name, _, _, _ in alltests:
+        result = results[name]
+        if result.overhead and result.times:
+            overhead = sum(result.overhead) / len(result.overhead)
+            shares.append((result.overhead_share, name, overhead))
+    for share, name, overhead in sorted(shares, reverse=True):
+        print(f"{name}: {overhead * 1e6:.2f}µs/request ({share:.0%} of measured time)")
+
+
+def selected(scenario, name, globs, everything=False):
+    """Check if a benchmark matches any of the globs.
+
+    Opt-in scenarios only match if `everything` is true or if a glob starts
+    with the scenario name.
+    """
+    for glob in globs:
+        if fnmatch(name, glob) and (
+            everything or scenario.default or glob.startswith(scenario.name)
+        ):
+            return True
+    return False
+
+
 if __name__ == "__main__":
     args = ap.parse_args()
+    if args.sources and (args.threads or args.asyncio):
+        # Concurrent wrappers clone the in-memory payload for each request,
+        # which does not work for readers that come from a body source.
+        ap.error("--sources cannot be combined with --threads or --asyncio")
     #: Allow CPU to cool down between tests
     sleeptime = args.sleep
     #: Continue testing for at least this many seconds per test
@@ -77,100 +405,348 @@ if __name__ == "__main__":
     precision = profile["precision"]
     rounds = args.rounds if args.rounds is not None else profile["rounds"]
 
-    from multipart_bench.scenarios import SCENARIOS, Result, Scenario
+    if args.cache is not None:
+        # Environment variables are inherited by worker processes
+        os.environ["MULTIPART_BENCH_CACHE"] = args.cache
+
+    from multipart_bench.scenarios import SCENARIOS, Result, Scenario, StreamingScenario
     from multipart_bench.parsers import PARSERS, dummy_parser
+    from multipart_bench.executor import create_executor, measure
+
+    # Parsers and the baseline to subtract from their results
+    candidates = [(parser, dummy_parser) for parser in PARSERS]
+    if args.asyncio:
+        from multipart_bench.aio import ASYNC_PARSERS, AsyncBench, dummy_asgi
+
+        for concurrency in args.asyncio:
+            null_func = AsyncBench(dummy_asgi, concurrency)
+            # Event loop overhead, compared to reading the payload synchronously
+            candidates.append((null_func, dummy_parser))
+            candidates += [
+                (AsyncBench(func, concurrency), null_func) for func in ASYNC_PARSERS
+            ]
+    if args.threads:
+        from multipart_bench.threads import ThreadBench
+
+        # A single thread is the normal benchmark
+        args.threads = sorted(set(args.threads) - {1})
+        for threads in args.threads:
+            null_func = ThreadBench(dummy_parser, threads)
+            candidates.append((null_func, dummy_parser))
+            candidates += [
+                (ThreadBench(parser, threads), null_func) for parser in PARSERS
+            ]
+    if args.consume:
+        from multipart_bench.consume import CONSUMERS
+
+        candidates += [(func, dummy_parser) for func in CONSUMERS]
+    if args.frameworks:
+        from multipart_bench.frameworks import FRAMEWORKS
+
+        names = {parser.__name__ for parser, _ in candidates}
+        for func in FRAMEWORKS:
+            candidates.append((func, func.null_func))
+            # The raw adapter to compare with, unless it already runs anyway
+            if func.parser and func.parser.__name__ not in names:
+                candidates.append((func.parser, func.null_func))
+                names.add(func.parser.__name__)
 
     if args.list:
-        for scenario in SCENARIOS:
-            for parser in PARSERS:
+        for scenario in (v for s in SCENARIOS for v in variants(s, args.chunks, args.sizes, args.seeds, args.sources)):
+            for parser, _ in candidates:
                 name = scenario.name_for(parser)
-                if not any(fnmatch(name, glob) for glob in args.benchmarks):
+                if not selected(scenario, name, args.benchmarks, args.all):
                     continue
                 print(name)
         sys.exit(0)
 
     print("Preparing benchmarks...")
     alltests: list[
-        tuple[str, Scenario, typing.Callable[[Scenario], Result]]
-    ] = []  # (name, scenario, parser)
+        tuple[str, Scenario, typing.Callable, typing.Callable]
+    ] = []  # (name, scenario, parser, null_func)
 
     baseline = PARSERS[0]
     calibrated_n = {}
 
     # Collecting and calibrating benchmarks (scenarios x parsers)
-    for scenario in shuffle(SCENARIOS):
-        for parser in shuffle(PARSERS):
-            name = scenario.name_for(parser)
+    for base in shuffle(SCENARIOS):
+        # Only scenarios with selected tests cost memory for their payloads
+        if not any(
+            selected(scenario, scenario.name_for(parser), args.benchmarks, args.all)
+            for scenario in variants(base, args.chunks, args.sizes, args.seeds, args.sources)
+            for parser, _ in candidates
+        ):
+            continue
+        if args.chunks or args.sources:
+            # Build the payload once and share it with all chunk size and source
+            # variants (created again below, so they copy the payload)
+            base.prepare()
+        for scenario in variants(base, args.chunks, args.sizes, args.seeds, args.sources):
+            for parser, null_func in shuffle(candidates):
+                name = scenario.name_for(parser)
 
-            if not any(fnmatch(name, glob) for glob in args.benchmarks):
-                continue
+                if not selected(scenario, name, args.benchmarks, args.all):
+                    continue
 
-            # Create profiles for each benchmark and skip failing benchmarks
-            pr = cProfile.Profile(timer=time.perf_counter)
-            pr.enable()
-            try:
-                scenario.run_once(parser)
-                pr.disable()
-                pr.dump_stats(f"var/{name}.prof")
-            except Exception as e:
-                pr.disable()
-                print(f"Skipping {name}: {e}")
-                continue
+                # Multi-gigabyte uploads would not fit into memory
+                if getattr(parser, "in_memory", False) and isinstance(
+                    scenario, StreamingScenario
+                ):
+                    print(f"Skipping {name}: Parser buffers the entire body in memory")
+                    continue
+
+                # Create profiles for each benchmark and skip failing benchmarks
+                pr = cProfile.Profile(timer=time.perf_counter)
+                if args.profiler == "cprofile":
+                    pr.enable()
+                try:
+                    start = time.perf_counter()
+                    scenario.run_once(parser)
+                    first_run = time.perf_counter() - start
+                    pr.disable()
+                    if args.profiler == "cprofile":
+                        pr.dump_stats(f"var/{name}.prof")
+                except Exception as e:
+                    pr.disable()
+                    print(f"Skipping {name}: {e}")
+                    continue
+
+                # Calibarate the number of repeats per test so that each test needs roughly
+                # the same time to complete. This makes fast tests more stable, while slow
+                # tests still complete in a reasonable amount of time. Tests that would
+                # exceed the calibration budget (e.g. multi-gigabyte uploads) run once.
+                gc.collect()
+                target_time = 1.0
+                min_n = 10 if first_run < target_time * 10 else 1
+                result = scenario.run_bench(parser, n=min_n, null_func=null_func)
+                result *= min_n * getattr(parser, "requests", 1)
+                calibrated_n[name] = n = max(min_n, int(target_time // result))
+
+                if args.asyncio and getattr(parser, "func", None) is dummy_asgi:
+                    # Async harness overhead per request compared to a sync read: a
+                    # payload clone, task setup and one receive() per chunk (+ EOF).
+                    # Not an await cost, as it includes all of these.
+                    overhead = scenario.run_bench(parser, n=n, null_func=null_func)
+                    awaits = -(-scenario.size // scenario.chunksize) + 1
+                    print(
+                        f"Seeded {name} (n={n}) async harness overhead"
+                        f" {overhead * 1e6:.2f}µs/request ({awaits} receive() calls)",
+                        flush=True,
+                    )
+                else:
+                    print(f"Seeded {name} (n={n}) ", flush=True)
 
-            # Calibarate the number of repeats per test so that each test needs roughly
-            # the same time to complete. This makes fast tests more stable, while slow
-            # tests still complete in a reasonable amount of time.
-            gc.collect()
-            target_time = 1.0
-            min_n = 10
-            result = scenario.run_bench(parser, n=min_n, null_func=dummy_parser) * min_n
-            calibrated_n[name] = n = max(min_n, int(target_time // result))
+                alltests.append((name, scenario, parser, null_func))
 
-            print(f"Seeded {name} (n={n}) ", flush=True)
+            # Payloads are built on demand, free them until the benchmarks need them
+            scenario.release()
 
-            alltests.append((name, scenario, parser))
+    executor, warnings = create_executor(args.jobs)
+    for warning in warnings:
+        print(f"Warning: {warning}")
+    if args.threads:
+        from multipart_bench.threads import gil_enabled
+
+        print(
+            f"Python {sys.version.split()[0]}, GIL {'enabled' if gil_enabled() else 'disabled'}."
+            " Parsers that scale below 100% serialize on the GIL or on shared state."
+        )
 
     print(
-        f"Running benchmarks ({args.profile}: {rounds} min rounds, {confidence_level:.0%} confidence level, ±{precision:.2%} precision) ..."
+        f"Running benchmarks ({args.profile}: {rounds} min rounds, {confidence_level:.0%} confidence level, ±{precision:.2%} precision, {executor.jobs} jobs) ..."
     )
     results: dict[str, Result] = {}
-    confidence_reached = set()
-    round = 0
-    while round < rounds or any(name not in confidence_reached for name in results):
+    for name, scenario, parser, _ in alltests:
+        # Load previous results in append mode
+        if args.append:
+            try:
+                results[name] = Result.load(f"var/{name}.json")
+            except FileNotFoundError:
+                pass
+
+        if name not in results:
+            results[name] = Result(name, scenario.size, [])
+
+        # Small form scenarios also collect per-request samples
+        if scenario.unit == "req/s" and results[name].iterations is None:
+            results[name] = results[name]._replace(iterations=[])
+
+        # Paired measurements also store the overhead of each batch
+        if args.paired and results[name].overhead is None:
+            results[name] = results[name]._replace(overhead=[])
+
+    # Only times measured in this run are recorded in the history
+    previous_counts = {name: len(result.times) for name, result in results.items()}
+
+    def save(name):
+        """Store a result of a pass before timing, unless it has no times yet."""
+        # `record` stores it with the first time. Interrupted runs or an
+        # exhausted --budget must not leave results without any.
+        if results[name].times:
+            results[name].save_to(f"var/{name}.json")
+
+    if args.memory:
+        print("Measuring memory usage...")
+        for name, scenario, parser, _ in alltests:
+            result = results[name] = results[name]._replace(
+                memory=scenario.run_memory(parser)
+            )
+            save(name)
+            print(f"{name} {format_memory(result)}", flush=True)
         print()
-        print(
-            f"Round {round + 1}/{rounds}: Skipping {len(confidence_reached)}/{len(alltests)} stable tests"
-        )
-        for name, scenario, parser in shuffle(alltests):
-            if name in confidence_reached:
-                continue
 
-            print(f"{round + 1}/{rounds} {name} ", end="", flush=True)
-            rfname = f"var/{name}.json"
+    if args.profiler == "sample":
+        from multipart_bench.flame import StackSampler, flamegraph_svg, write_collapsed
 
-            # Load previous results in append mode
-            if args.append and name not in results:
-                try:
-                    results[name] = Result.load(rfname)
-                except FileNotFoundError:
-                    pass
+        print("Sampling stacks...")
+        for name, scenario, parser, _ in alltests:
+            # Warm up, then sample steady-state runs for at least `mintime`
+            scenario.run_once(parser)
+            sampler = StackSampler()
+            sampler.start()
+            try:
+                start = time.perf_counter()
+                while time.perf_counter() - start < mintime:
+                    for _ in range(calibrated_n[name]):
+                        scenario.run_once(parser)
+            finally:
+                sampler.stop()
+            stacks = sampler.collapsed(root=Scenario.run_once.__code__, lines=args.flame_lines)
+            write_collapsed(stacks, f"var/{name}.folded")
+            flamegraph_svg(stacks, f"var/{name}.svg", name)
+            print(f"{name} {sum(stacks.values())} samples", flush=True)
+        print()
 
-            if name not in results:
-                results[name] = Result(name, scenario.size, [])
+    if args.counters:
+        from multipart_bench.perf import PerfCounters
 
-            result = results[name]
+        counters = PerfCounters()
+        for name, reason in counters.unavailable.items():
+            print(f"Warning: Counter {name} is not available ({reason})")
+        if counters.fds:
+            print("Collecting performance counters...")
+            for name, scenario, parser, null_func in alltests:
+                # Counters only follow threads started after they were opened,
+                # so restart the worker threads of threaded tests.
+                for func in (parser, null_func):
+                    if hasattr(func, "close"):
+                        func.close()
+                result = results[name] = results[name]._replace(
+                    counters=scenario.run_counters(
+                        parser, counters, calibrated_n[name], null_func
+                    )
+                )
+                save(name)
+                print(f"{name} {format_counters(result)}", flush=True)
+        else:
+            print("Warning: No performance counters available, skipping")
+        counters.close()
+        print()
 
-            # Allow CPU to cool down
-            time.sleep(sleeptime)
+    if args.latency:
+        print("Measuring per-call latency of non-blocking parsers...")
+        for name, scenario, parser, _ in alltests:
+            if not parser.__name__.endswith("_sansio"):
+                continue
+            # Collect enough samples for stable tail percentiles
+            samples = list(results[name].feed_latencies or [])
+            start = time.perf_counter()
+            while time.perf_counter() - start < mintime * 10 and (
+                len(samples) < 1000 or time.perf_counter() - start < mintime
+            ):
+                samples += scenario.run_latency(parser)
+            result = results[name] = results[name]._replace(feed_latencies=samples)
+            save(name)
+            print(f"{name} {format_feed_latency(result)}", flush=True)
+        print()
+
+    def task(name, scenario, parser, null_func):
+        sample = scenario.unit == "req/s"
+        n = calibrated_n[name]
+        return scenario, parser, n, null_func, sleeptime, sample, args.paired
+
+    def record(scenario, parser, outcome, label):
+        """Add a measurement to its result, store and print it."""
+        measurement, overhead, samples, _ = outcome
+        name = scenario.name_for(parser)
+        result = results[name]
+        result.times.append(measurement)
+        if overhead is not None:
+            result.overhead.append(overhead)
+        if samples:
+            result.iterations.extend(samples)
+
+        # Store results for later processing
+        result.save_to(f"var/{name}.json")
 
-            # Run the actual benchmark
-            measurement = scenario.run_bench(
-                parser, n=calibrated_n[name], null_func=dummy_parser
+        # Print result
+        print(f"{label} {name} ", end="")
+        overhead = f", {result.overhead_share:.0%} overhead" if result.overhead else ""
+        bsresult = results.get(scenario.name_for(baseline))
+        if baseline is parser or result.count == 1 or not (bsresult and bsresult.times):
+            print(
+                f"{format_result(scenario, result)} (±{result.relative_confidence_interval(confidence_level):.2%}{overhead}, n={calibrated_n[name]})",
+                flush=True,
             )
-            result.times.append(measurement)
+        else:
+            percent = 100 * (
+                (result.throughput - bsresult.throughput) / bsresult.throughput
+            )
+            print(
+                f"{format_result(scenario, result)} ({percent:+.2f}%, ±{result.relative_confidence_interval(confidence_level):.2%}{overhead}, n={calibrated_n[name]})",
+                flush=True,
+            )
+        return result
+
+    if args.budget:
+        from multipart_bench.scheduler import BudgetScheduler
+
+        tests = {name: (name, *test) for name, *test in alltests}
+        scheduler = BudgetScheduler(
+            tests, args.budget, rounds, precision, confidence_level
+        )
+        print(f"Time budget: {args.budget:.0f}s")
+        while names := scheduler.next(results, executor.jobs):
+            tasks = [task(*tests[name]) for name in names]
+            # Run the actual benchmarks (in parallel, if enabled)
+            for (scenario, parser, *_), outcome in executor.imap_unordered(measure, tasks):
+                scheduler.spent(scenario.name_for(parser), outcome[-1])
+                left = max(0, scheduler.deadline - time.monotonic())
+                record(scenario, parser, outcome, f"[{left:.0f}s left]")
+
+        unconverged = scheduler.unconverged(results)
+        print()
+        if unconverged:
+            print(f"{len(unconverged)}/{len(alltests)} tests did not reach ±{precision:.2%} within the budget:")
+            for name in unconverged:
+                result = results[name]
+                print(
+                    f"  {name} ±{result.relative_confidence_interval(confidence_level):.2%}"
+                    f" after {result.count} measurements"
+                )
+        else:
+            print(f"All {len(alltests)} tests reached ±{precision:.2%}")
+
+    confidence_reached = set()
+    round = 0
+    while not args.budget and (
+        round < rounds or any(name not in confidence_reached for name in results)
+    ):
+        print()
+        print(
+            f"Round {round + 1}/{rounds}: Skipping {len(confidence_reached)}/{len(alltests)} stable tests"
+        )
+
+        tasks = [
+            task(name, scenario, parser, null_func)
+            for name, scenario, parser, null_func in shuffle(alltests)
+            if name not in confidence_reached
+        ]
 
-            # Store results for later processing
-            result.save_to(rfname)
+        # Run the actual benchmarks (in parallel, if enabled)
+        for (scenario, parser, *_), outcome in executor.imap_unordered(measure, tasks):
+            name = scenario.name_for(parser)
+            result = record(scenario, parser, outcome, f"{round + 1}/{rounds}")
 
             # Mark test as 'good enough' after min-rounds
             if (
@@ -180,18 +756,49 @@ if __name__ == "__main__":
             ):
                 confidence_reached.add(name)
 
-            # Print result
-            if baseline is parser or round == 0:
-                print(
-                    f"{result.throughput / 1024 / 1024:.2f}MB/s (±{result.relative_confidence_interval(confidence_level):.2%}, n={calibrated_n[name]})"
-                )
-            else:
-                bsresult = results[scenario.name_for(baseline)]
-                percent = 100 * (
-                    (result.throughput - bsresult.throughput) / bsresult.throughput
-                )
-                print(
-                    f"{result.throughput / 1024 / 1024:.2f}MB/s ({percent:+.2f}%, ±{result.relative_confidence_interval(confidence_level):.2%}, n={calibrated_n[name]})"
-                )
-
         round += 1
+
+    executor.shutdown()
+    if args.sources:
+        from multipart_bench.sources import remove_source_files
+
+        # Source files are shared by all workers, remove them once at the end
+        remove_source_files()
+
+    if args.history:
+        from multipart_bench.history import History
+
+        history = History(args.history)
+        run_id = history.start_run(args.profile, sys.argv[1:])
+        for name, scenario, parser, _ in alltests:
+            result = results[name]
+            history.record(
+                run_id, scenario, parser, result, result.times[previous_counts[name] :]
+            )
+        history.close()
+        print(f"Recorded run #{run_id} in {args.history}")
+
+    if any(scenario.family for _, scenario, _, _ in alltests):
+        print()
+        print("Throughput across random scenarios (median, 10th-90th percentile, range):")
+        print_families(alltests, results, baseline)
+
+    if args.sizes:
+        print()
+        print("Runtime over input size (exponent and confidence interval):")
+        print_complexity(alltests, results)
+
+    if args.paired:
+        print()
+        print("Harness overhead (subtracted from results):")
+        print_overhead(alltests, results)
+
+    if args.frameworks:
+        print()
+        print("Framework overhead (compared to the raw parser adapter):")
+        print_frameworks(alltests, results)
+
+    if args.threads:
+        print()
+        print("Thread scaling (aggregate throughput and efficiency):")
+        print_scaling(results, args.threads)
@@ -0,0 +1,181 @@
+import argparse
+import importlib
+from fnmatch import fnmatch
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+#: Top-level modules of each parser family (by parser name prefix). Modules of
+#: other families are blocked in the child process, so their import cost does
+#: not count.
+FAMILY_MODULES = {
+    "multipart": ["multipart"],
+    "django": ["django"],
+    "werkzeug": ["werkzeug"],
+    "starlette": ["python_multipart"],
+    "streaming": ["streaming_form_data"],
+    "emmett": ["emmett_core"],
+    "cgi": ["cgi"],
+}
+#: Standard library modules that the parsers module imports for all families,
+#: and the families whose import cost includes them. They are imported before
+#: the timer starts for all other families.
+STDLIB_MODULES = {"email.parser": ["email", "cgi"]}
+
+ap = argparse.ArgumentParser(
+    description="Measure import time, first-request latency and warm-up per parser,"
+    " each in a fresh interpreter."
+)
+ap.add_argument(
+    "-s",
+    "--scenario",
+    default="simple",
+    help="Scenario to parse (default: simple)",
+)
+ap.add_argument(
+    "-r",
+    "--repeat",
+    default=5,
+    type=int,
+    help="Number of fresh interpreters per parser. Results are medians.",
+)
+ap.add_argument(
+    "-n",
+    "--iterations",
+    default=1000,
+    type=int,
+    help="Maximum number of runs per interpreter to detect the steady state",
+)
+ap.add_argument(
+    "--child",
+    default=None,
+    metavar="PARSER",
+    help=argparse.SUPPRESS,
+)
+ap.add_argument(
+    "parsers", nargs="*", default=["*"], help="Glob patterns for parsers to run"
+)
+
+
+def steady_state(times, window=5, tolerance=1.1):
+    """Index of the first run after which runtimes stay close to the final level.
+
+    The final level is the median of the last quarter of all runs. The steady
+    state is reached as soon as the median of a sliding window gets within
+    `tolerance` of that level. Returns ``(None, None)`` without any runs.
+    """
+    if not times:
+        return None, None
+    final = statistics.median(times[-max(window, len(times) // 4) :])
+    for i in range(len(times) - window + 1):
+        if statistics.median(times[i : i + window]) <= final * tolerance:
+            return i, final
+    return len(times), final
+
+
+def child(parser_name, scenario_name, iterations):
+    """Run in a fresh interpreter and print results as JSON."""
+    prefix = parser_name.split("_")[0]
+    family = FAMILY_MODULES.get(prefix, [])
+    for modules in FAMILY_MODULES.values():
+        for module in modules:
+            if module not in family:
+                sys.modules[module] = None
+    for module, families in STDLIB_MODULES.items():
+        if prefix not in families:
+            importlib.import_module(module)
+
+    # The benchmark harness (numpy, scipy) is not part of the import cost
+    from multipart_bench.scenarios import get_scenario
+
+    scenario = get_scenario(scenario_name).prepare()
+
+    start = time.perf_counter()
+    import multipart_bench.parsers as parsers
+
+    import_time = time.perf_counter() - start
+    parser = getattr(parsers, parser_name)
+
+    times = []
+    deadline = time.perf_counter() + 10
+    while len(times) < iterations and time.perf_counter() < deadline:
+        start = time.perf_counter()
+        scenario.run_once(parser)
+        times.append(time.perf_counter() - start)
+
+    warmup, warm = steady_state(times[1:])
+    json.dump(
+        {
+            "import": import_time,
+            "first": times[0],
+            "warmup": warmup,
+            "warm": warm,
+            "runs": len(times),
+        },
+        sys.stdout,
+    )
+
+
+if __name__ == "__main__":
+    args = ap.parse_args()
+    if args.iterations < 2:
+        ap.error("-n must be at least 2 to measure runs after the first one")
+
+    if args.child:
+        child(args.child, args.scenario, args.iterations)
+        sys.exit(0)
+
+    from multipart_bench.formatting import format_duration, format_speed
+    from multipart_bench.parsers import PARSERS
+    from multipart_bench.scenarios import get_scenario
+
+    scenario = get_scenario(args.scenario)
+    print(f"Cold start on scenario {scenario.name!r} ({args.repeat} interpreters per parser)")
+    for parser in PARSERS:
+        name = parser.__name__
+        if not any(fnmatch(name, glob) for glob in args.parsers):
+            continue
+        runs = []
+        for _ in range(args.repeat):
+            proc = subprocess.run(
+                [sys.executable, __file__, "--child", name, "-s", scenario.name]
+                + ["-n", str(args.iterations)],
+                capture_output=True,
+                text=True,
+            )
+            if proc.returncode != 0:
+                error = proc.stderr.strip().splitlines()[-1:] or ["unknown error"]
+                print(f"Skipping {name}: {error[0]}")
+                break
+            runs.append(json.loads(proc.stdout))
+        if len(runs) < args.repeat:
+            continue
+
+        def median(key):
+            return statistics.median(run[key] for run in runs)
+
+        # The deadline may stop slow parsers after their first run
+        warm_runs = [run for run in runs if run["warm"] is not None]
+        if not warm_runs:
+            print(
+                f"{name}: import {format_duration(median('import'))},"
+                f" first run {format_duration(median('first'))},"
+                " steady state n/a (no runs after the first one)",
+                flush=True,
+            )
+            continue
+        runs = warm_runs
+
+        warm = median("warm")
+        speed = 1 / warm if scenario.unit == "req/s" else scenario.size / warm / 1024 / 1024
+        speed = format_speed(speed, scenario.unit)
+        print(
+            f"{name}: import {format_duration(median('import'))},"
+            f" first run {format_duration(median('first'))}"
+            f" ({median('first') / warm:.1f}x warm),"
+            f" steady after {median('warmup'):.0f} runs,"
+            f" warm {format_duration(warm)} ({speed})",
+            flush=True,
+        )
@@ -0,0 +1,104 @@
+import argparse
+from fnmatch import fnmatch
+import random
+
+ap = argparse.ArgumentParser(
+    description="Run a weighted mix of scenarios and report sustained throughput per parser."
+)
+ap.add_argument(
+    "-m",
+    "--mix",
+    default="simple=80,mixed=15,upload=5",
+    help="Scenarios and their relative weights (default: simple=80,mixed=15,upload=5)",
+)
+ap.add_argument(
+    "-n",
+    "--requests",
+    default=1000,
+    type=int,
+    help="Number of requests per round",
+)
+ap.add_argument(
+    "-r",
+    "--rounds",
+    default=3,
+    type=int,
+    help="Number of rounds. Parsers are run in random order each round.",
+)
+ap.add_argument(
+    "--seed",
+    default=0,
+    type=int,
+    help="Seed for the request sequence, which is the same for all parsers.",
+)
+ap.add_argument(
+    "parsers", nargs="*", default=["*"], help="Glob patterns for parsers to run"
+)
+
+
+if __name__ == "__main__":
+    args = ap.parse_args()
+
+    from multipart_bench.formatting import format_duration, format_speed
+    from multipart_bench.mix import parse_mix, run_mix, schedule
+    from multipart_bench.parsers import PARSERS, dummy_parser
+    from multipart_bench.scenarios import StreamingScenario
+
+    mix = parse_mix(args.mix)
+    requests = schedule(mix, args.requests, args.seed)
+    total = sum(weight for _, weight in mix)
+    print(
+        "Traffic mix: "
+        + ", ".join(f"{s.name} {w / total:.0%}" for s, w in mix)
+        + f" ({args.requests} requests per round, seed {args.seed})"
+    )
+
+    # The dummy parser shows the overhead of the benchmark itself
+    parsers = [dummy_parser] + [
+        parser
+        for parser in PARSERS
+        if any(fnmatch(parser.__name__, glob) for glob in args.parsers)
+    ]
+
+    # Warm up and skip parsers that fail or are unsuitable for the mix
+    candidates = []
+    for parser in parsers:
+        streaming = any(isinstance(s, StreamingScenario) for s, _ in mix)
+        if getattr(parser, "in_memory", False) and streaming:
+            print(f"Skipping {parser.__name__}: Parser buffers the entire body in memory")
+            continue
+        try:
+            for scenario, _ in mix:
+                scenario.run_once(parser)
+        except Exception as e:
+            print(f"Skipping {parser.__name__}: {e}")
+            continue
+        candidates.append(parser)
+
+    results = {}
+    for round in range(args.rounds):
+        print(f"Round {round + 1}/{args.rounds}", flush=True)
+        random.shuffle(candidates)
+        for parser in candidates:
+            result = run_mix(parser, requests)
+            previous = results.get(parser.__name__)
+            results[parser.__name__] = previous.merge(result) if previous else result
+
+    print()
+    ranked = sorted(results.values(), key=lambda r: r.requests_per_second, reverse=True)
+    best = max(
+        [r.requests_per_second for r in ranked if r.name != dummy_parser.__name__]
+        or [1]
+    )
+    for result in ranked:
+        latencies = ", ".join(
+            f"{name} p50 {format_duration(result.latency(name, 50))}"
+            f" p99 {format_duration(result.latency(name, 99))}"
+            for name in dict.fromkeys(scenario.name for scenario, _ in mix)
+            if name in result.latencies
+        )
+        print(
+            f"{result.name}: {format_speed(result.requests_per_second, 'req/s')}"
+            f" ({result.requests_per_second / best:.0%}),"
+            f" {format_speed(result.bytes_per_second / 1024 / 1024)} ({latencies})"
+        )